@@ -4,7 +4,26 @@ Custom context processors to make settings available in templates.
 SECURITY NOTE: Only expose values that are safe to expose client-side.
 Never expose secrets like AUTH0_CLIENT_SECRET or SECRET_KEY here.
 """
+from functools import lru_cache
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+@lru_cache(maxsize=None)
+def _public_settings():
+    return {
+        'GOOGLE_MAPS_API_KEY': settings.GOOGLE_MAPS_API_KEY or '',
+        'AUTH0_DOMAIN': settings.AUTH0_DOMAIN or '',
+        'AUTH0_CLIENT_ID': settings.AUTH0_CLIENT_ID or '',
+        'AUTH0_CALLBACK_URL': settings.AUTH0_CALLBACK_URL or '',
+    }
+
+
+@receiver(setting_changed)
+def _clear_public_settings(**kwargs):
+    _public_settings.cache_clear()
 
 
 def api_keys(request):
@@ -19,10 +38,7 @@ def api_keys(request):
     - AUTH0_CLIENT_SECRET (server-side only)
     - SECRET_KEY (server-side only)
     - Email passwords (server-side only)
+
+    The values only depend on settings, so the dictionary is built once and reused for every render.
     """
-    return {
-        'GOOGLE_MAPS_API_KEY': settings.GOOGLE_MAPS_API_KEY or '',
-        'AUTH0_DOMAIN': settings.AUTH0_DOMAIN or '',
-        'AUTH0_CLIENT_ID': settings.AUTH0_CLIENT_ID or '',
-        'AUTH0_CALLBACK_URL': settings.AUTH0_CALLBACK_URL or '',
-    }
+    return _public_settings()
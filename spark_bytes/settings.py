@@ -71,15 +71,32 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Serves MEDIA_ROOT before sessions/auth (see SERVE_MEDIA)
+    'spark_bytes_app.middleware.MediaFileMiddleware',
+    # Must run before sessions/auth so cached anonymous pages skip them entirely
+    'spark_bytes_app.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Staff-only, opt-in per request (X-Profile header or ?_profile)
+    'spark_bytes_app.middleware.RequestProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'spark_bytes_app.routers.ReplicaStickinessMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
+# Session storage. Options:
+#   django.contrib.sessions.backends.db (default): one session-table query per request that uses the session
+#   django.contrib.sessions.backends.cached_db: reads served from the cache, writes go through to the database
+#   django.contrib.sessions.backends.signed_cookies: no server-side storage at all
+SESSION_ENGINE = env('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+
+# Full-page cache for anonymous visitors (see spark_bytes_app/middleware.py)
+ANONYMOUS_PAGE_CACHE_URL_NAMES = {'all_events', 'event_detail', 'event_detail_alt', 'event_map'}
+ANONYMOUS_PAGE_CACHE_TIMEOUT = env.int('ANONYMOUS_PAGE_CACHE_TIMEOUT', default=60)
+
 LOGIN_URL = '/login'
 LOGOUT_URL = '/logout'
 LOGIN_REDIRECT_URL = '/'
@@ -100,6 +117,10 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'spark_bytes.context_processors.api_keys',
             ],
+            'libraries': {
+                # spark_bytes is not an installed app, so its template tags are registered explicitly
+                'custom_filters': 'spark_bytes.templatetags.custom_filters',
+            },
         },
     },
 ]
@@ -117,6 +138,63 @@ DATABASES = {
     }
 }
 
+# Optional read replica, e.g. DATABASE_REPLICA_URL=sqlite:////path/to/replica.sqlite3
+# Read-only views (event list/map/detail, profiles, API) read from it; writes always go to 'default'.
+if env('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = env.db('DATABASE_REPLICA_URL')
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['spark_bytes_app.routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write (read-your-writes)
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=10)
+
+# On-demand request profiling for staff; captures are listed at /profiling/
+REQUEST_PROFILER_ENABLED = env.bool('REQUEST_PROFILER_ENABLED', default=True)
+REQUEST_PROFILE_DIR = env('REQUEST_PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+REQUEST_PROFILE_KEEP = env.int('REQUEST_PROFILE_KEEP', default=20)  # Oldest captures beyond this are deleted
+REQUEST_PROFILE_INTERVAL = 0.001  # Stack sampling interval in seconds
+
+
+# Cache
+# Defaults to a per-process in-memory cache. Set CACHE_URL (e.g. redis://127.0.0.1:6379/1 or
+# pymemcache://127.0.0.1:11211) to share cached data between workers.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Seconds that event list data (e.g. filter facet counts) may be served from cache.
+# Cached entries are also invalidated whenever an event is saved or deleted.
+EVENT_LIST_CACHE_TIMEOUT = env.int('EVENT_LIST_CACHE_TIMEOUT', default=60)
+
+# Events have no end time: an event stays in the upcoming list and map for this many hours
+# after it starts, and archive_events only archives events older than this
+EVENT_GRACE_HOURS = env.int('EVENT_GRACE_HOURS', default=6)
+
+# Month calendar (/events/calendar/): cached per month, invalidated when an event in that month changes
+EVENT_CALENDAR_CACHE_TIMEOUT = env.int('EVENT_CALENDAR_CACHE_TIMEOUT', default=60 * 60)
+EVENT_CALENDAR_TOP_EVENTS = 3  # Events listed per day
+
+# Delta sync (/api/v1/events/sync/)
+EVENT_SYNC_TOMBSTONE_DAYS = 7  # Deletion tombstones kept this long; older sync tokens must resync from scratch
+EVENT_SYNC_SAFETY_LAG = 2  # Seconds; changes this recent wait for the next poll so slow commits are never skipped
+
+# Trending events (/events/trending/): reservations lose half their weight every TRENDING_HALF_LIFE_HOURS
+TRENDING_HALF_LIFE_HOURS = env.float('TRENDING_HALF_LIFE_HOURS', default=24)
+TRENDING_SIZE = 10  # Events shown
+
+
+# Rate limiting (see spark_bytes_app/ratelimit.py)
+# Per-scope token buckets as '<requests>/<s|m|h|d>', keyed by logged-in user and/or client IP.
+# Buckets live in the default cache, so set CACHE_URL to a shared cache when running several workers.
+RATELIMIT_ENABLE = env.bool('RATELIMIT_ENABLE', default=True)
+RATELIMIT_TRUST_X_FORWARDED_FOR = env.bool('RATELIMIT_TRUST_X_FORWARDED_FOR', default=False)
+RATE_LIMITS = {
+    'reserve': {'user': '10/m', 'ip': '30/m'},
+    'login': {'ip': '20/m'},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -163,6 +241,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploads are stored once per unique content under their sha256 (see `dedupe_media` for existing files)
+DEFAULT_FILE_STORAGE = 'spark_bytes_app.storage.ContentAddressedStorage'
+# Serve MEDIA_ROOT from Django with ETags, range requests and long-lived caching of hashed names.
+# Turn off when a web server or CDN serves MEDIA_ROOT directly.
+SERVE_MEDIA = env.bool('SERVE_MEDIA', default=True)
+MEDIA_CACHE_MAX_AGE = 60 * 60  # Seconds browsers may cache media whose names are not content hashes
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
@@ -192,6 +276,21 @@ if not GOOGLE_MAPS_API_KEY:
     import warnings
     warnings.warn("GOOGLE_MAPS_API_KEY is not set. Maps will not work.", UserWarning)
 
+# Geocoding of event locations
+# GEOCODING_PROVIDER is the dotted path of a spark_bytes_app.geocoding.GeocodingProvider subclass.
+# The default offline gazetteer only knows BU campus buildings; use
+# spark_bytes_app.geocoding.GoogleGeocodingProvider with a server-side GEOCODING_API_KEY
+# (not the browser-restricted Maps key) to resolve arbitrary addresses.
+GEOCODING_PROVIDER = env('GEOCODING_PROVIDER', default='spark_bytes_app.geocoding.GazetteerProvider')
+GEOCODING_API_KEY = env('GEOCODING_API_KEY', default='')
+# Days before a location the provider could not resolve is looked up again. Misses cached by
+# a different provider are always looked up again; resolved locations are kept indefinitely.
+GEOCODING_MISS_TTL_DAYS = env.int('GEOCODING_MISS_TTL_DAYS', default=30)
+
+# "Events near me" index: seconds before a worker reloads its in-memory coordinate
+# index from the database, which bounds staleness for writes made by other workers
+NEARBY_INDEX_MAX_AGE = env.int('NEARBY_INDEX_MAX_AGE', default=300)
+
 # Auth0 Configuration
 # SECURITY: These should be set via environment variables, especially AUTH0_CLIENT_SECRET
 AUTH0_DOMAIN = env('AUTH0_DOMAIN', default='')
@@ -17,10 +17,14 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
 from spark_bytes import settings
+from spark_bytes_app import api
 from spark_bytes_app.views import (
     EventDetailView, ProfileDetailView, EventListView, ProfileListView, 
     CustomLoginView, CustomLogoutView, RegisterView, CreateEventView, 
-    ReserveSpotView, DeleteEventView, EventMapView, auth0_callback, registration_success
+    ReserveSpotView, CancelReservationView, DeleteEventView, ExportAttendeesView,
+    EventMapView, ArchivedEventListView, EventCalendarView, TrendingEventsView,
+    auth0_callback, registration_success, events_nearby, rate_limit_stats,
+    profile_captures, profile_capture_download, event_calendar_json
 )
 
 urlpatterns = [
@@ -36,10 +40,27 @@ urlpatterns = [
     path('registration_success/', registration_success, name='registration_success'),
     path('create_event/', CreateEventView.as_view(), name='create_event'),
     path('events/<int:pk>/reserve/', ReserveSpotView.as_view(), name='reserve_spot'),
+    path('events/<int:pk>/cancel/', CancelReservationView.as_view(), name='cancel_reservation'),
     path('event/<int:pk>/delete/', DeleteEventView.as_view(), name='delete_event'),
+    path('event/<int:pk>/attendees.csv', ExportAttendeesView.as_view(), name='export_attendees'),
     path('events/map/', EventMapView.as_view(), name='event_map'),
+    path('events/archive/', ArchivedEventListView.as_view(), name='archived_events'),
+    path('events/trending/', TrendingEventsView.as_view(), name='trending_events'),
+    path('events/calendar/', EventCalendarView.as_view(), name='event_calendar'),
+    path('events/calendar/<int:year>/<int:month>/', EventCalendarView.as_view(), name='event_calendar_month'),
+    path('events/calendar/<int:year>/<int:month>.json', event_calendar_json, name='event_calendar_json'),
+    path('events/nearby/', events_nearby, name='events_nearby'),
     path('auth0/callback/', auth0_callback, name='auth0_callback'),
+    path('ratelimit/stats/', rate_limit_stats, name='rate_limit_stats'),
+    path('profiling/', profile_captures, name='profile_captures'),
+    path('profiling/<str:capture_id>.<str:ext>', profile_capture_download, name='profile_capture_download'),
+    path('api/v1/events/', api.event_list, name='api_event_list'),
+    path('api/v1/events/sync/', api.event_sync, name='api_event_sync'),
+    path('api/v1/events/<int:pk>/', api.event_detail, name='api_event_detail'),
+    path('api/v1/profiles/', api.profile_list, name='api_profile_list'),
+    path('api/v1/profiles/<int:pk>/', api.profile_detail, name='api_profile_detail'),
 ]
 
+# Only reached when SERVE_MEDIA is off; otherwise MediaFileMiddleware answers media requests first
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,17 +1,144 @@
 from django.contrib import admin
-from .models import Profile, Event
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
 
-admin.site.register(Profile)
-admin.site.register(Event)
+from .models import Profile, Event, WaitlistEntry, Notification, GeocodeCache, ReservationLog
 
-# class EventAdmin(admin.ModelAdmin):
-#    list_display = ('name', 'location', 'date', 'created_by', 'current_reservations', 'reservation_limit')
-#    list_filter = ('location', 'date')  # Add filters for location and date
-#    search_fields = ('name', 'created_by__user__username')  # Add search functionality
-#    list_editable = ('reservation_limit',)  # Allow inline editing of the reservation limit
 
-#    def current_reservations(self, obj):
-#        return obj.reserved_by.count()
-#    current_reservations.short_description = 'Current Reservations'
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    """
+    Admin changelist for events. Reservation counts are annotated onto the changelist query
+    and creators are joined in, so a page costs the same number of queries however many rows it shows.
+    """
+    list_display = ('name', 'location', 'date', 'created_by', 'current_reservations', 'reservation_limit')
+    list_filter = ('date', 'food_types', 'allergies')
+    list_select_related = ('created_by__user',)
+    list_editable = ('reservation_limit',)  # Allow inline editing of the reservation limit
+    search_fields = ('^name', '^location')  # See get_search_results
+    search_help_text = 'Start of an event name or location, or the exact username of its creator.'
+    date_hierarchy = 'date'
+    raw_id_fields = ('created_by', 'reserved_by')  # Avoid loading every profile into select widgets
+    show_full_result_count = False  # Skip the extra unfiltered COUNT(*) on filtered pages
 
-# admin.site.register(Event, EventAdmin)
+    def get_queryset(self, request):
+        """
+        Annotates each event with its reservation count.
+        """
+        return super().get_queryset(request).annotate(reservation_count=Count('reserved_by', distinct=True))
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches events whose name or location starts with the search term, or whose creator has
+        it as username. Each condition is served by an index (the NOCASE name and location indexes,
+        and the creator subquery), so SQLite ORs index lookups instead of scanning every event.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        creators = Profile.objects.filter(user__username=term).values('pk')
+        return queryset.filter(
+            Q(name__istartswith=term) | Q(location__istartswith=term) | Q(created_by__in=creators)
+        ), False
+
+    @admin.display(description='Current Reservations', ordering='reservation_count')
+    def current_reservations(self, obj):
+        return obj.reservation_count
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    """
+    Admin changelist for profiles, with created-event and reservation counts annotated in one query.
+    """
+    list_display = ('user', 'buid', 'email', 'events_created', 'reservations')
+    list_select_related = ('user',)
+    search_fields = ('=buid',)  # See get_search_results
+    search_help_text = 'Exact BUID, username or email address.'
+    raw_id_fields = ('user',)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        """
+        Annotates each profile with the number of events it created and reserved.
+        """
+        return super().get_queryset(request).annotate(
+            event_count=Count('event', distinct=True),
+            reservation_count=Count('reserved_events', distinct=True),
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches profiles by exact BUID (NOCASE index), username (unique index) or email address.
+        Emails are not indexed, so that condition scans the user table, but never the profiles.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(
+            Q(buid__iexact=term)
+            | Q(user__in=User.objects.filter(username=term).values('pk'))
+            | Q(user__in=User.objects.filter(email__iexact=term).values('pk'))
+        ), False
+
+    @admin.display(description='Email', ordering='user__email')
+    def email(self, obj):
+        return obj.user.email
+
+    @admin.display(description='Events Created', ordering='event_count')
+    def events_created(self, obj):
+        return obj.event_count
+
+    @admin.display(description='Reservations', ordering='reservation_count')
+    def reservations(self, obj):
+        return obj.reservation_count
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """
+    Admin changelist for waitlist entries, ordered by event and position.
+    """
+    list_display = ('event', 'profile', 'position', 'created_at')
+    list_select_related = ('event__created_by__user', 'profile__user')
+    raw_id_fields = ('event', 'profile')
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """
+    Admin changelist for queued and delivered notifications.
+    """
+    list_display = ('profile', 'subject', 'created_at', 'sent_at')
+    list_select_related = ('profile__user',)
+    raw_id_fields = ('profile', 'event')
+
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    """
+    Admin changelist for cached geocoding results. Deleting an entry forces the location to be looked up again.
+    """
+    list_display = ('query', 'latitude', 'longitude', 'provider', 'created_at')
+    list_filter = ('provider',)
+    search_fields = ('^query',)
+
+
+@admin.register(ReservationLog)
+class ReservationLogAdmin(admin.ModelAdmin):
+    """
+    Read-only changelist for the append-only reservation log.
+    """
+    list_display = ('event', 'profile', 'action', 'occupancy', 'created_at')
+    list_filter = ('action',)
+    # Event.__str__ shows the creator's username
+    list_select_related = ('event__created_by__user', 'profile__user')
+    raw_id_fields = ('event', 'profile')
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
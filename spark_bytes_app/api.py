@@ -0,0 +1,388 @@
+"""
+Read-only JSON API (v1) for events and profiles.
+
+- List endpoints use cursor (keyset) pagination, so every page is a single indexed range
+  query no matter how deep the client has paged.
+- `fields=` selects a sparse fieldset; only the requested columns are fetched, via `values()`.
+- Event lists accept the same filters as `EventListView` (name, location, date, food_types,
+  allergies) plus `archived=1` for past events.
+- `events/sync/` returns only the events created, changed or deleted since a sync token,
+  using the indexed `Event.updated_at` and the `EventDeletion` tombstone log, so polling
+  costs depend on the number of changes rather than on the number of events.
+- Responses are gzip-compressed when the client accepts it.
+
+Every endpoint runs exactly one query (sync runs two, and three for a request without a token),
+against the read replica when one is configured.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET
+
+from .filters import filter_events
+from .models import Event, EventDeletion, Profile
+from .routers import read_from_replica
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Public field name -> ORM lookup passed to values()
+EVENT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'location': 'location',
+    'date': 'date',
+    'food_items': 'food_items',
+    'food_types': 'food_types',
+    'allergies': 'allergies',
+    'reservation_limit': 'reservation_limit',
+    'reservation_count': 'reservation_count',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'image_url': 'img',
+    'created_by': 'created_by_id',
+    'created_by_username': 'created_by__user__username',
+    'archived': 'archived',
+    'updated_at': 'updated_at',
+}
+
+PROFILE_FIELDS = {
+    'id': 'id',
+    'username': 'user__username',
+    'email': 'user__email',
+    'buid': 'buid',
+    'image_url': 'img',
+}
+
+FILE_FIELDS = {'image_url'}
+
+
+class APIError(Exception):
+    """
+    Raised for invalid request parameters; rendered as a 400 response.
+    """
+
+
+def error_response(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(request, available):
+    """
+    Returns the public field names requested with `fields=a,b,c`, or all fields if omitted.
+    """
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    fields = [field.strip() for field in requested.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise APIError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise APIError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise APIError('Invalid cursor')
+
+
+def decode_event_cursor(cursor):
+    """
+    Decodes an event list cursor into its `(date, pk)` keyset values.
+    """
+    values = decode_cursor(cursor)
+    if not (isinstance(values, list) and len(values) == 2 and isinstance(values[0], str)
+            and isinstance(values[1], int)):
+        raise APIError('Invalid cursor')
+    try:
+        date = parse_datetime(values[0])
+    except ValueError:
+        date = None
+    if date is None:
+        raise APIError('Invalid cursor')
+    return date, values[1]
+
+
+def decode_profile_cursor(cursor):
+    """
+    Decodes a profile list cursor into the last profile id.
+    """
+    pk = decode_cursor(cursor)
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise APIError('Invalid cursor')
+    return pk
+
+
+def decode_sync_token(token):
+    """
+    Decodes a sync token into `(since, last_id, last_deletion_id, initial)`.
+    """
+    try:
+        values = decode_cursor(token)
+    except APIError:
+        raise APIError('Invalid token')
+    if not isinstance(values, list) or len(values) != 4:
+        raise APIError('Invalid token')
+    since, last_id, last_deletion_id, initial = values
+    if since is not None:
+        try:
+            since = parse_datetime(since) if isinstance(since, str) else None
+        except ValueError:
+            since = None
+        if since is None or timezone.is_naive(since):
+            raise APIError('Invalid token')
+    ids_valid = all(isinstance(value, int) and not isinstance(value, bool) for value in (last_id, last_deletion_id))
+    if not ids_valid or not isinstance(initial, bool):
+        raise APIError('Invalid token')
+    return since, last_id, last_deletion_id, initial
+
+
+def parse_date_param(request):
+    value = request.GET.get('date')
+    if value:
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+        if date is None:
+            raise APIError('date must be a date (YYYY-MM-DD)')
+
+
+def project(queryset, fields, mapping):
+    """
+    Fetches only the requested fields and renames them to their public names.
+    """
+    lookups = {mapping[field] for field in fields}
+    rows = []
+    for row in queryset.values(*lookups):
+        item = {}
+        for field in fields:
+            value = row[mapping[field]]
+            if field in FILE_FIELDS:
+                value = default_storage.url(value) if value else ''
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            item[field] = value
+        rows.append(item)
+    return rows
+
+
+def next_url(request, cursor):
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def event_queryset(fields):
+    queryset = Event.objects.all()
+    if 'reservation_count' in fields:
+        # A correlated subquery avoids grouping by every selected column
+        Reservation = Event.reserved_by.through
+        counts = (
+            Reservation.objects.filter(event_id=OuterRef('pk'))
+            .order_by().values('event_id').annotate(count=Count('pk')).values('count')
+        )
+        queryset = queryset.annotate(
+            reservation_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+        )
+    return queryset
+
+
+@require_GET
+@gzip_page
+@read_from_replica
+def event_list(request):
+    """
+    Lists upcoming events (or past events with `archived=1`), soonest first (most recent first
+    for past events), filtered like the HTML event list.
+
+    Query parameters: fields, limit, cursor, archived, name, location, date, food_types, allergies.
+    """
+    try:
+        fields = parse_fields(request, EVENT_FIELDS)
+        limit = parse_limit(request)
+        archived = request.GET.get('archived') == '1'
+        parse_date_param(request)
+
+        queryset = event_queryset(fields)
+        queryset = queryset.past() if archived else queryset.upcoming()
+        queryset = filter_events(queryset, request.GET)
+
+        if 'cursor' in request.GET:
+            date, pk = decode_event_cursor(request.GET['cursor'])
+            if archived:
+                queryset = queryset.filter(Q(date__lt=date) | Q(date=date, pk__lt=pk))
+            else:
+                queryset = queryset.filter(Q(date__gt=date) | Q(date=date, pk__gt=pk))
+    except APIError as e:
+        return error_response(str(e))
+
+    ordering = ('-date', '-pk') if archived else ('date', 'pk')
+    # Fetch the keyset columns alongside the requested ones and one extra row to detect a next page
+    rows = project(
+        queryset.order_by(*ordering)[:limit + 1],
+        list(dict.fromkeys(fields + ['id', 'date'])),
+        EVENT_FIELDS,
+    )
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    cursor = encode_cursor([rows[-1]['date'], rows[-1]['id']]) if has_next else None
+
+    return JsonResponse({
+        'results': [{field: row[field] for field in fields} for row in rows],
+        'next': next_url(request, cursor) if cursor else None,
+    })
+
+
+@require_GET
+@gzip_page
+@read_from_replica
+def event_sync(request):
+    """
+    Returns the events created, changed or deleted since a sync token.
+
+    Without `token` this starts an initial sync of all upcoming events. Every response carries
+    a new `token`: call again with it straight away while `has_more` is true, then poll with the
+    last one. `changed` holds whole events (or `fields`), including events that were archived,
+    which clients should remove along with the ids in `deleted`. Tokens older than
+    `settings.EVENT_SYNC_TOMBSTONE_DAYS` are rejected with 410, and the client must start over.
+
+    Query parameters: token, fields, limit.
+    """
+    try:
+        fields = parse_fields(request, EVENT_FIELDS)
+        limit = parse_limit(request)
+        if 'token' in request.GET:
+            since, last_id, last_deletion_id, initial = decode_sync_token(request.GET['token'])
+        else:
+            since, last_id, last_deletion_id, initial = None, 0, None, True
+    except APIError as e:
+        return error_response(str(e))
+
+    now = timezone.now()
+    if since is not None and since < now - timedelta(days=settings.EVENT_SYNC_TOMBSTONE_DAYS):
+        return error_response('Sync token expired; start again without a token.', status=410)
+    # Rows this recent may still have slower transactions committing before them, so leave them for the next poll
+    horizon = now - timedelta(seconds=settings.EVENT_SYNC_SAFETY_LAG)
+    if last_deletion_id is None:
+        # Deletions before the initial sync are irrelevant to the client
+        last_deletion_id = EventDeletion.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    queryset = event_queryset(fields).filter(updated_at__lt=horizon)
+    if initial:
+        queryset = queryset.upcoming()
+    if since is not None:
+        queryset = queryset.filter(Q(updated_at__gt=since) | Q(updated_at=since, pk__gt=last_id))
+    rows = project(
+        queryset.order_by('updated_at', 'pk')[:limit + 1],
+        list(dict.fromkeys(fields + ['id', 'updated_at'])),
+        EVENT_FIELDS,
+    )
+    deletions = list(
+        EventDeletion.objects.filter(pk__gt=last_deletion_id, deleted_at__lt=horizon)
+        .order_by('pk').values_list('pk', 'event_id')[:limit + 1]
+    )
+    has_more = len(rows) > limit or len(deletions) > limit
+    rows, deletions = rows[:limit], deletions[:limit]
+
+    if initial and not has_more:
+        # Every upcoming event up to the horizon has been sent; later polls start from there
+        since, last_id = horizon.isoformat(), 0
+    elif rows:
+        since, last_id = rows[-1]['updated_at'], rows[-1]['id']
+    elif since is not None:
+        since = since.isoformat()
+    if deletions:
+        last_deletion_id = deletions[-1][0]
+
+    return JsonResponse({
+        'changed': [{field: row[field] for field in fields} for row in rows],
+        'deleted': [event_id for _, event_id in deletions],
+        'token': encode_cursor([since, last_id, last_deletion_id, initial and has_more]),
+        'has_more': has_more,
+    })
+
+
+@require_GET
+@gzip_page
+@read_from_replica
+def event_detail(request, pk):
+    """
+    Returns a single event. Accepts `fields`.
+    """
+    try:
+        fields = parse_fields(request, EVENT_FIELDS)
+    except APIError as e:
+        return error_response(str(e))
+    rows = project(event_queryset(fields).filter(pk=pk), fields, EVENT_FIELDS)
+    if not rows:
+        return error_response('Event not found', status=404)
+    return JsonResponse(rows[0])
+
+
+@require_GET
+@gzip_page
+@read_from_replica
+def profile_list(request):
+    """
+    Lists profiles in id order. Query parameters: fields, limit, cursor.
+    """
+    try:
+        fields = parse_fields(request, PROFILE_FIELDS)
+        limit = parse_limit(request)
+        queryset = Profile.objects.all()
+        if 'cursor' in request.GET:
+            queryset = queryset.filter(pk__gt=decode_profile_cursor(request.GET['cursor']))
+    except APIError as e:
+        return error_response(str(e))
+
+    rows = project(queryset.order_by('pk')[:limit + 1], list(dict.fromkeys(fields + ['id'])), PROFILE_FIELDS)
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    cursor = encode_cursor(rows[-1]['id']) if has_next else None
+
+    return JsonResponse({
+        'results': [{field: row[field] for field in fields} for row in rows],
+        'next': next_url(request, cursor) if cursor else None,
+    })
+
+
+@require_GET
+@gzip_page
+@read_from_replica
+def profile_detail(request, pk):
+    """
+    Returns a single profile. Accepts `fields`.
+    """
+    try:
+        fields = parse_fields(request, PROFILE_FIELDS)
+    except APIError as e:
+        return error_response(str(e))
+    rows = project(Profile.objects.filter(pk=pk), fields, PROFILE_FIELDS)
+    if not rows:
+        return error_response('Profile not found', status=404)
+    return JsonResponse(rows[0])
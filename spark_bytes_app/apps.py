@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class SparkBytesAppConfig(AppConfig):
+    """
+    Application configuration for the Spark! Bytes app. Connects the model signal handlers on startup.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'spark_bytes_app'
+
+    def ready(self):
+        """
+        Imports the signal handlers so they are registered once the app registry is ready.
+        """
+        from . import signals  # noqa: F401
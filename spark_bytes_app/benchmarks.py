@@ -0,0 +1,143 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks seed synthetic data inside a transaction that is always rolled back, so they
+can be run against a development database without leaving anything behind.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Event, Profile
+
+# Rough bounding box around Boston University's campuses
+CAMPUS_LAT = (42.335, 42.365)
+CAMPUS_LNG = (-71.130, -71.085)
+
+
+class Rollback(Exception):
+    """
+    Raised internally to roll back the benchmark transaction.
+    """
+
+
+@contextmanager
+def rolled_back():
+    """
+    Runs the block in a transaction that is rolled back afterwards, even on success.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def seed_events(count, geolocated=True, reservations=0, seed=0):
+    """
+    Bulk-creates synthetic upcoming events owned by a throwaway profile.
+
+    Args:
+        count (int): Number of events to create.
+        geolocated (bool): Whether to give the events random campus coordinates.
+        reservations (int): Number of throwaway profiles to reserve a spot at every event.
+        seed (int): Random seed, so runs are comparable.
+
+    Returns:
+        list[Event]: The created events.
+    """
+    rng = random.Random(seed)
+    user = User.objects.create(username=f'bench-owner-{seed}', email='bench@example.com')
+    owner = Profile.objects.create(user=user, buid='00000000')
+    food_types = [value for value, _ in Event.FOOD_TYPES]
+    allergies = [value for value, _ in Event.ALLERGIES]
+    now = timezone.now()
+
+    events = Event.objects.bulk_create([
+        Event(
+            name=f'Benchmark event {i}',
+            created_by=owner,
+            location=f'Building {i % 50}',
+            img='event_images/benchmark.png',
+            date=now + timedelta(hours=rng.randint(1, 24 * 60)),
+            food_types=rng.choice(food_types),
+            allergies=rng.choice(allergies),
+            latitude=rng.uniform(*CAMPUS_LAT) if geolocated else None,
+            longitude=rng.uniform(*CAMPUS_LNG) if geolocated else None,
+        )
+        for i in range(count)
+    ], batch_size=500)
+
+    if reservations:
+        users = User.objects.bulk_create([
+            User(username=f'bench-attendee-{seed}-{i}', email=f'attendee{i}@example.com')
+            for i in range(reservations)
+        ])
+        attendees = Profile.objects.bulk_create([Profile(user=u, buid=f'{i:08d}') for i, u in enumerate(users)])
+        Reservation = Event.reserved_by.through
+        Reservation.objects.bulk_create([
+            Reservation(event_id=event.pk, profile_id=attendee.pk)
+            for event in events for attendee in attendees
+        ], batch_size=1000)
+
+    return events
+
+
+def time_call(func, repeat=20, warmup=1):
+    """
+    Times repeated calls of a function.
+
+    Returns:
+        dict: Best and median wall-clock time per call, in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': min(samples), 'median_ms': statistics.median(samples)}
+
+
+def time_interleaved(funcs, repeat=20, warmup=1):
+    """
+    Times repeated calls of several functions, calling them in turn so that every function is
+    sampled under the same machine load.
+
+    Returns:
+        list[dict]: Best and median wall-clock time per call of each function, in milliseconds.
+    """
+    for _ in range(warmup):
+        for func in funcs:
+            func()
+    samples = [[] for _ in funcs]
+    for _ in range(repeat):
+        for func, func_samples in zip(funcs, samples):
+            start = time.perf_counter()
+            func()
+            func_samples.append((time.perf_counter() - start) * 1000)
+    return [{'best_ms': min(s), 'median_ms': statistics.median(s)} for s in samples]
+
+
+def count_queries(func):
+    """
+    Calls a function once and returns the number of database queries it ran.
+    """
+    queries = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        func()
+    return queries
@@ -0,0 +1,90 @@
+"""
+Per-month event calendar: event counts and the most reserved events for each day of a month.
+
+A month is summarized by a single query over the indexed `date` range, grouped by event to
+count reservations, and cached under a per-month key. Signals delete that key whenever an
+event in the month (or moving into or out of it) is saved, deleted or has its reservations
+changed, so other months stay cached.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Event
+
+
+def month_bounds(year, month):
+    """
+    Returns the aware [start, end) datetimes of a month in the current time zone.
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+def event_month(date):
+    """
+    Returns the (year, month) an event date falls in, in the current time zone.
+    """
+    local = timezone.localtime(date)
+    return local.year, local.month
+
+
+def month_cache_key(year, month):
+    return f'event_calendar:{year}-{month:02d}'
+
+
+def invalidate_month(year, month):
+    cache.delete(month_cache_key(year, month))
+
+
+def month_summary(year, month):
+    """
+    Summarizes a month's events by day.
+
+    Args:
+        year (int): Calendar year.
+        month (int): Calendar month, 1-12.
+
+    Returns:
+        dict: {'year', 'month', 'days'}, where 'days' maps each ISO date that has events to
+        {'count': int, 'top_events': [{'id', 'name', 'reservations'}, ...]} with at most
+        `settings.EVENT_CALENDAR_TOP_EVENTS` events, most reserved first.
+    """
+    key = month_cache_key(year, month)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    start, end = month_bounds(year, month)
+    rows = (
+        Event.objects.filter(date__gte=start, date__lt=end)
+        .annotate(day=TruncDate('date'), reservations=Count('reserved_by'))
+        .values('id', 'name', 'day', 'reservations')
+        .order_by('day', '-reservations', 'date')
+    )
+    days = {}
+    for row in rows:
+        day = days.setdefault(row['day'].isoformat(), {'count': 0, 'top_events': []})
+        day['count'] += 1
+        if len(day['top_events']) < settings.EVENT_CALENDAR_TOP_EVENTS:
+            day['top_events'].append({'id': row['id'], 'name': row['name'], 'reservations': row['reservations']})
+
+    summary = {'year': year, 'month': month, 'days': days}
+    cache.set(key, summary, settings.EVENT_CALENDAR_CACHE_TIMEOUT)
+    return summary
+
+
+def adjacent_months(year, month):
+    """
+    Returns ((year, month) before, (year, month) after).
+    """
+    start, _ = month_bounds(year, month)
+    previous = start - timedelta(days=1)
+    following = start + timedelta(days=32)
+    return (previous.year, previous.month), (following.year, following.month)
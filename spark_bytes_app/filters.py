@@ -0,0 +1,94 @@
+"""
+Event search filters shared by the event list views, plus facet counts for the filter sidebar.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Count
+from django.utils.dateparse import parse_date
+
+from .models import Event
+
+FILTER_PARAMS = ('name', 'location', 'date', 'food_types', 'allergies')
+
+# Facet dimension -> choices shown in the sidebar
+FACETS = {
+    'food_types': Event.FOOD_TYPES,
+    'allergies': Event.ALLERGIES,
+}
+
+
+def filter_events(queryset, params, exclude=()):
+    """
+    Applies the event search filters from a GET QueryDict to a queryset.
+
+    Args:
+        queryset (QuerySet): The events to filter.
+        params (QueryDict): Request parameters (name, location, date, food_types, allergies).
+        exclude (Iterable[str]): Filter parameters to ignore, used when counting facets.
+
+    Returns:
+        QuerySet: The filtered events.
+    """
+    name = params.get('name', '') if 'name' not in exclude else ''
+    location = params.get('location', '') if 'location' not in exclude else ''
+    date = params.get('date', '') if 'date' not in exclude else ''
+    food_types = params.getlist('food_types') if 'food_types' not in exclude else []
+    allergies = params.getlist('allergies') if 'allergies' not in exclude else []
+
+    if name:
+        queryset = queryset.filter(name__icontains=name)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    if date:
+        # Malformed dates are ignored rather than raising on the date lookup
+        try:
+            date = parse_date(date)
+        except ValueError:
+            date = None
+        if date:
+            queryset = queryset.filter(date__date=date)
+    if food_types:
+        queryset = queryset.filter(food_types__in=food_types)
+    if allergies:
+        for allergy in allergies:
+            queryset = queryset.filter(allergies__icontains=allergy)
+
+    return queryset
+
+
+def facet_counts(queryset, params):
+    """
+    Counts matching events for every food type and allergen choice.
+
+    Each dimension is counted with a single GROUP BY query over the events matching all
+    *other* active filters, so ticking a box shows how many events that choice would add.
+
+    Args:
+        queryset (QuerySet): The unfiltered base events (e.g. upcoming events).
+        params (QueryDict): Request parameters holding the current filter state.
+
+    Returns:
+        dict: Maps each facet name to a list of {'value', 'label', 'count'} dicts in choice order.
+    """
+    facets = {}
+    for field, choices in FACETS.items():
+        counts = dict(
+            filter_events(queryset, params, exclude={field})
+            .order_by()
+            .values_list(field)
+            .annotate(count=Count('pk'))
+        )
+        facets[field] = [
+            {'value': value, 'label': label, 'count': counts.get(value, 0)}
+            for value, label in choices
+        ]
+    return facets
+
+
+def filter_cache_key(prefix, params):
+    """
+    Builds a stable cache key for a filter state, independent of parameter order.
+    """
+    items = sorted((key, value) for key in FILTER_PARAMS for value in params.getlist(key) if value)
+    return f'{prefix}:{hashlib.md5(urlencode(items).encode()).hexdigest()}'
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 
+from spark_bytes_app.geocoding import geocode
 from spark_bytes_app.models import Event
 
 class CustomUserCreationForm(UserCreationForm):
@@ -85,4 +86,18 @@ class EventForm(forms.ModelForm):
             'food_types': forms.Select(attrs={'class': 'form-control'}),  # Dropdown for food types
             'allergies': forms.Select(attrs={'class': 'form-control'}),  # Dropdown for allergies
             'reservation_limit': forms.NumberInput(attrs={'class': 'form-control'})  # Style reservation limit field
-        }
\ No newline at end of file
+        }
+
+    def save(self, commit=True):
+        """
+        Fills in the event's coordinates from its location before saving, if they are not set yet.
+        """
+        event = super().save(commit=False)
+        if event.latitude is None or event.longitude is None:
+            coordinates = geocode(event.location)
+            if coordinates:
+                event.latitude, event.longitude = coordinates
+        if commit:
+            event.save()
+            self._save_m2m()
+        return event
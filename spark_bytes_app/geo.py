@@ -0,0 +1,195 @@
+"""
+In-memory spatial index of geolocated upcoming events, used by the "events near me" endpoint.
+
+Coordinates are kept in contiguous NumPy arrays so a nearest-events query is a single vectorized
+haversine pass plus an `argpartition`, instead of a Python loop over ORM rows. The index is built
+lazily on first use and then kept up to date incrementally from the Event post_save/post_delete
+signals. NumPy is only imported once the index is first queried, so workers that never serve the
+endpoint do not pay for it. Because each worker process holds its own copy and only sees signals for writes it
+handled itself, the index is also rebuilt from the database once it is older than
+`NEARBY_INDEX_MAX_AGE` seconds, which bounds how stale another worker's writes can appear.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """
+    Computes great-circle distances from one point to many points.
+
+    Args:
+        lat (float): Latitude of the origin, in radians.
+        lng (float): Longitude of the origin, in radians.
+        lats (ndarray): Latitudes of the targets, in radians.
+        lngs (ndarray): Longitudes of the targets, in radians.
+
+    Returns:
+        ndarray: Distances in kilometres, one per target.
+    """
+    import numpy as np
+
+    dlat = lats - lat
+    dlng = lngs - lng
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat) * np.cos(lats) * np.sin(dlng / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def is_geolocated(event):
+    """
+    Returns True if the event has usable coordinates (set and not the 0,0 placeholder).
+    """
+    if event.latitude is None or event.longitude is None:
+        return False
+    return not (event.latitude == 0 and event.longitude == 0)
+
+
+class EventCoordinateIndex:
+    """
+    Growable column store of (event id, latitude, longitude, timestamp) for geolocated, non-archived events.
+
+    Rows are addressed through an id -> row mapping so updates are O(1) and deletes are O(1)
+    swap-removes. Storage grows by doubling, so inserts are amortized O(1).
+    """
+    def __init__(self, max_age=None):
+        self._lock = threading.Lock()
+        self._max_age = max_age
+        self._built_at = None
+        self._rows = {}
+        self._size = 0
+
+    def _reset(self, capacity):
+        import numpy as np
+
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._lats = np.empty(capacity, dtype=np.float64)
+        self._lngs = np.empty(capacity, dtype=np.float64)
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._rows = {}
+        self._size = 0
+
+    def _grow(self):
+        import numpy as np
+
+        capacity = max(64, len(self._ids) * 2)
+        for name in ('_ids', '_lats', '_lngs', '_timestamps'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _set_row(self, row, event_id, latitude, longitude, date):
+        self._ids[row] = event_id
+        self._lats[row] = math.radians(latitude)
+        self._lngs[row] = math.radians(longitude)
+        self._timestamps[row] = date.timestamp()
+
+    def _append(self, event_id, latitude, longitude, date):
+        if self._size == len(self._ids):
+            self._grow()
+        self._set_row(self._size, event_id, latitude, longitude, date)
+        self._rows[event_id] = self._size
+        self._size += 1
+
+    def _discard(self, event_id):
+        row = self._rows.pop(event_id, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            # Move the last row into the hole so the live rows stay contiguous
+            for array in (self._ids, self._lats, self._lngs, self._timestamps):
+                array[row] = array[last]
+            self._rows[int(self._ids[row])] = row
+        self._size = last
+
+    @property
+    def max_age(self):
+        if self._max_age is not None:
+            return self._max_age
+        return getattr(settings, 'NEARBY_INDEX_MAX_AGE', 300)
+
+    def rebuild(self):
+        """
+        Reloads the index from the database in one query.
+        """
+        from .models import Event  # Imported here to avoid a circular import
+
+        rows = list(
+            Event.objects.upcoming()
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .exclude(latitude=0, longitude=0)
+            .values_list('pk', 'latitude', 'longitude', 'date')
+        )
+        with self._lock:
+            self._reset(capacity=max(64, len(rows)))
+            for event_id, latitude, longitude, date in rows:
+                self._append(event_id, latitude, longitude, date)
+            self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+            self.rebuild()
+
+    def update(self, event):
+        """
+        Inserts, moves or removes a single event after it was saved.
+        Does nothing until the index has been built; the first query loads everything anyway.
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+            if event.archived or not is_geolocated(event):
+                self._discard(event.pk)
+            elif event.pk in self._rows:
+                self._set_row(self._rows[event.pk], event.pk, event.latitude, event.longitude, event.date)
+            else:
+                self._append(event.pk, event.latitude, event.longitude, event.date)
+
+    def remove(self, event_id):
+        """
+        Drops an event from the index after it was deleted.
+        """
+        with self._lock:
+            self._discard(event_id)
+
+    def nearest(self, latitude, longitude, radius_km, k):
+        """
+        Finds the k nearest upcoming events within a radius, including events still within
+        their `EVENT_GRACE_HOURS` grace period, like `Event.objects.upcoming()`.
+
+        Args:
+            latitude (float): Latitude of the origin, in degrees.
+            longitude (float): Longitude of the origin, in degrees.
+            radius_km (float): Maximum distance in kilometres.
+            k (int): Maximum number of events to return.
+
+        Returns:
+            list[tuple[int, float]]: (event id, distance in km) pairs, nearest first.
+        """
+        import numpy as np
+
+        from .models import grace_cutoff  # Imported here to avoid a circular import
+
+        self._ensure_built()
+        with self._lock:
+            size = self._size
+            ids = self._ids[:size].copy()
+            lats = self._lats[:size].copy()
+            lngs = self._lngs[:size].copy()
+            timestamps = self._timestamps[:size].copy()
+
+        distances = haversine_km(math.radians(latitude), math.radians(longitude), lats, lngs)
+        candidates = np.flatnonzero((distances <= radius_km) & (timestamps >= grace_cutoff().timestamp()))
+        if len(candidates) > k:
+            # Partial selection: O(n) to find the k smallest, then sort only those k
+            candidates = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(distances[candidates], kind='stable')]
+        return [(int(ids[row]), float(distances[row])) for row in candidates]
+
+
+event_index = EventCoordinateIndex()
@@ -0,0 +1,184 @@
+"""
+Server-side geocoding of free-text event locations.
+
+Lookups go through a persistent cache table (`GeocodeCache`) keyed by the normalized location
+string, so each distinct location is sent to a provider at most once. Locations the provider
+could not resolve are cached too, but looked up again after `settings.GEOCODING_MISS_TTL_DAYS`
+or when a different provider is configured. The provider is pluggable through
+`settings.GEOCODING_PROVIDER`:
+
+- `GazetteerProvider` (default): an offline lookup of Boston University campus buildings.
+- `GoogleGeocodingProvider`: the Google Geocoding API, using `settings.GEOCODING_API_KEY`.
+"""
+import json
+import logging
+import re
+from datetime import timedelta
+from functools import lru_cache
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_location(location):
+    """
+    Normalizes a location string for cache lookups: case-folded, punctuation-trimmed
+    and with runs of whitespace collapsed, so "GSU, " and "gsu" share a cache entry.
+    """
+    location = re.sub(r'[^\w\s&#/-]', ' ', location or '')
+    return ' '.join(location.casefold().split())
+
+
+class GeocodingProvider:
+    """
+    Base class for geocoding providers.
+
+    Subclasses implement `geocode`, which receives a normalized location and returns a
+    (latitude, longitude) tuple, or None if the location could not be resolved.
+    """
+    name = 'base'
+
+    def geocode(self, query):
+        raise NotImplementedError
+
+
+class GazetteerProvider(GeocodingProvider):
+    """
+    Offline provider that resolves well-known Boston University buildings by name or abbreviation.
+    Needs no network access, which makes it suitable for development and tests.
+    """
+    name = 'gazetteer'
+
+    # Building -> (latitude, longitude, aliases)
+    BUILDINGS = {
+        'George Sherman Union': (42.3510, -71.1089, ['gsu', '775 commonwealth']),
+        'Mugar Memorial Library': (42.3510, -71.1082, ['mugar', 'mugar library', '771 commonwealth']),
+        'Photonics Center': (42.3493, -71.1063, ['photonics', '8 st mary']),
+        'College of Arts & Sciences': (42.3503, -71.1040, ['cas', 'college of arts and sciences', '725 commonwealth']),
+        'Center for Computing & Data Sciences': (42.3499, -71.1036, ['cds', 'center for computing and data sciences', '665 commonwealth']),
+        'Questrom School of Business': (42.3494, -71.0997, ['questrom', '595 commonwealth']),
+        'Marsh Chapel': (42.3506, -71.1063, ['marsh plaza', '735 commonwealth']),
+        'Law Tower': (42.3509, -71.1075, ['school of law', '765 commonwealth']),
+        'Tsai Performance Center': (42.3500, -71.1043, ['tsai', '685 commonwealth']),
+        'College of Engineering': (42.3486, -71.1045, ['eng', 'engineering', '110 cummington']),
+        'Warren Towers': (42.3489, -71.1040, ['warren', '700 commonwealth']),
+        'Myles Standish Hall': (42.3489, -71.0954, ['myles', 'myles standish']),
+        'Kilachand Hall': (42.3504, -71.0986, ['kilachand', '91 bay state']),
+        'Fitness & Recreation Center': (42.3519, -71.1158, ['fitrec', 'fitness and recreation center', '915 commonwealth']),
+        'Agganis Arena': (42.3521, -71.1176, ['agganis', '925 commonwealth']),
+        'Student Village 2': (42.3525, -71.1187, ['stuvi2', 'stuvi 2', 'student village', '33 harry agganis']),
+        'Claflin Hall': (42.3520, -71.1166, ['claflin', 'west campus']),
+        'BU Medical Campus': (42.3358, -71.0722, ['bumc', 'medical campus', '72 east concord', '72 e concord']),
+    }
+
+    def __init__(self):
+        aliases = {}
+        for building, (latitude, longitude, extra) in self.BUILDINGS.items():
+            for alias in [building, *extra]:
+                aliases[normalize_location(alias)] = (latitude, longitude)
+        # Try longer aliases first so "student village 2" wins over "student village"
+        self._patterns = [
+            (re.compile(rf'(?<!\w){re.escape(alias)}(?!\w)'), coordinates)
+            for alias, coordinates in sorted(aliases.items(), key=lambda item: -len(item[0]))
+        ]
+
+    def geocode(self, query):
+        for pattern, coordinates in self._patterns:
+            if pattern.search(query):
+                return coordinates
+        return None
+
+
+class GoogleGeocodingProvider(GeocodingProvider):
+    """
+    Provider backed by the Google Geocoding API. Results are biased towards Boston.
+    """
+    name = 'google'
+    endpoint = 'https://maps.googleapis.com/maps/api/geocode/json'
+
+    def geocode(self, query):
+        params = urlencode({
+            'address': query,
+            'components': 'administrative_area:MA|country:US',
+            'bounds': '42.33,-71.13|42.37,-71.06',
+            'key': settings.GEOCODING_API_KEY,
+        })
+        try:
+            with urlopen(f'{self.endpoint}?{params}', timeout=5) as response:
+                data = json.load(response)
+        except (URLError, ValueError, OSError) as e:
+            logger.error(f"Geocoding request failed for {query!r}: {str(e)}")
+            raise
+
+        if data.get('status') != 'OK' or not data.get('results'):
+            return None
+        location = data['results'][0]['geometry']['location']
+        return location['lat'], location['lng']
+
+
+@lru_cache(maxsize=None)
+def get_provider():
+    """
+    Returns the configured geocoding provider instance.
+    """
+    return import_string(settings.GEOCODING_PROVIDER)()
+
+
+def geocode_many(locations):
+    """
+    Resolves many locations, consulting the cache for all of them in one query and calling
+    the provider once per distinct location that has never been resolved. Cached misses are
+    retried once they have expired or were recorded by a different provider.
+
+    Args:
+        locations (Iterable[str]): Free-text locations.
+
+    Returns:
+        dict: Maps each normalized location to a (latitude, longitude) tuple, or None if unresolved.
+    """
+    from .models import GeocodeCache  # Imported here to avoid a circular import
+
+    provider = get_provider()
+    miss_expiry = timezone.now() - timedelta(days=settings.GEOCODING_MISS_TTL_DAYS)
+    queries = {normalize_location(location) for location in locations} - {''}
+    results = {
+        entry.query: entry.coordinates
+        for entry in GeocodeCache.objects.filter(query__in=queries)
+        if entry.coordinates or (entry.provider == provider.name and entry.created_at > miss_expiry)
+    }
+
+    new_entries = []
+    for query in queries - results.keys():
+        try:
+            coordinates = provider.geocode(query)
+        except Exception:
+            continue  # Transient failure: leave uncached so it is retried next time
+        results[query] = coordinates
+        new_entries.append(GeocodeCache(
+            query=query,
+            latitude=coordinates[0] if coordinates else None,
+            longitude=coordinates[1] if coordinates else None,
+            provider=provider.name,
+        ))
+    # Expired misses already have a row, which is replaced
+    GeocodeCache.objects.bulk_create(
+        new_entries, update_conflicts=True, unique_fields=['query'],
+        update_fields=['latitude', 'longitude', 'provider', 'created_at'],
+    )
+    return results
+
+
+def geocode(location):
+    """
+    Resolves a single free-text location.
+
+    Returns:
+        tuple[float, float] | None: (latitude, longitude), or None if the location could not be resolved.
+    """
+    return geocode_many([location]).get(normalize_location(location))
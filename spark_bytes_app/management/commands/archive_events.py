@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from spark_bytes_app.models import Event, EventDeletion, WaitlistEntry
+
+
+class Command(BaseCommand):
+    """
+    Moves past events out of the upcoming set by flagging them as archived.
+
+    Meant to be run periodically (e.g. hourly from cron). Archived events keep their
+    reservations so their history stays browsable, but they drop out of the
+    (archived, date) index range that the list and map views scan, and their
+    now-pointless waitlist entries are removed. Archiving bumps `updated_at` so delta-sync
+    clients drop the events, and deletion tombstones older than
+    `settings.EVENT_SYNC_TOMBSTONE_DAYS` are pruned.
+
+    Usage:
+        python manage.py archive_events [--grace-hours N] [--batch-size 500] [--dry-run]
+    """
+    help = 'Archives events whose date has passed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=int, default=settings.EVENT_GRACE_HOURS,
+            help='Only archive events that started at least this many hours ago (default: settings.EVENT_GRACE_HOURS).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of events to archive per transaction (default: 500).',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report how many events would be archived without changing anything.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        candidates = Event.objects.filter(archived=False, date__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'{candidates.count()} event(s) would be archived.')
+            return
+
+        archived = 0
+        while True:
+            with transaction.atomic():
+                batch = list(candidates.order_by('date').values_list('pk', flat=True)[:options['batch_size']])
+                if not batch:
+                    break
+                WaitlistEntry.objects.filter(event_id__in=batch).delete()
+                archived += Event.objects.filter(pk__in=batch).update(archived=True, updated_at=timezone.now())
+
+        horizon = timezone.now() - timedelta(days=settings.EVENT_SYNC_TOMBSTONE_DAYS)
+        pruned, _ = EventDeletion.objects.filter(deleted_at__lt=horizon).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} event(s); pruned {pruned} deletion tombstone(s).'))
@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from spark_bytes_app.benchmarks import rolled_back, seed_events
+
+FAST_PATH = 'spark_bytes_app.middleware.AnonymousPageCacheMiddleware'
+
+
+class Command(BaseCommand):
+    """
+    Measures requests per second for anonymous visitors on the public pages, with and without
+    the anonymous full-page cache, using seeded events that are rolled back afterwards.
+
+    Requests go through the full middleware stack in-process via Django's test client, so the
+    numbers exclude network and WSGI server overhead.
+
+    Usage:
+        python manage.py bench_anonymous [--events 200] [--requests 200]
+    """
+    help = 'Benchmarks anonymous requests/s for the event list, detail and map pages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=200, help='Number of synthetic events (default: 200).')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per page and mode (default: 200).')
+
+    def handle(self, *args, **options):
+        without_fast_path = [m for m in settings.MIDDLEWARE if m != FAST_PATH]
+        with_fast_path = [FAST_PATH] + without_fast_path if FAST_PATH not in settings.MIDDLEWARE else settings.MIDDLEWARE
+
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['testserver']):
+            events = seed_events(options['events'], reservations=5)
+            pages = {
+                'event list': '/',
+                'event detail': f'/event/{events[0].pk}/',
+                'event map': '/events/map/',
+            }
+            for label, url in pages.items():
+                results = []
+                for mode, middleware in (('full stack', without_fast_path), ('fast path', with_fast_path)):
+                    with override_settings(MIDDLEWARE=middleware):
+                        cache.clear()
+                        results.append((mode, *self._measure(url, options['requests'])))
+                self.stdout.write(f'{label} ({url})')
+                for mode, rate, queries in results:
+                    self.stdout.write(f'  {mode:<10} {rate:9.1f} req/s  {queries} queries/request')
+                self.stdout.write(self.style.SUCCESS(f'  Speedup: {results[1][1] / results[0][1]:.1f}x'))
+
+    def _measure(self, url, requests):
+        client = Client()
+        response = client.get(url)  # Warm up (and fill the page cache when enabled)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} returned {response.status_code}')
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            client.get(url)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(url)
+        return requests / (time.perf_counter() - start), len(queries)
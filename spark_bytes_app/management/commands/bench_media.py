@@ -0,0 +1,90 @@
+import hashlib
+import os
+import tempfile
+import time
+from types import ModuleType
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import re_path
+from django.views.static import serve
+
+from spark_bytes.urls import urlpatterns
+from spark_bytes_app.storage import content_addressed_name
+
+MEDIA_MIDDLEWARE = 'spark_bytes_app.middleware.MediaFileMiddleware'
+
+
+class Command(BaseCommand):
+    """
+    Compares requests/s for media files served by MediaFileMiddleware against the previous
+    setup, where `django.views.static.serve` runs behind the full middleware stack and URL
+    routing, for a full download, a revalidation and a byte-range request.
+
+    Files are written to a temporary MEDIA_ROOT that is removed afterwards. Requests are made
+    in-process through Django's test client, so the numbers exclude the network and any
+    sendfile savings of the WSGI server.
+
+    Usage:
+        python manage.py bench_media [--size 200000] [--requests 500]
+    """
+    help = 'Benchmarks media serving throughput with and without MediaFileMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=200_000, help='Size of the test image in bytes (default: 200000).')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per case and mode (default: 500).')
+
+    def handle(self, *args, **options):
+        data = os.urandom(options['size'])
+        name = content_addressed_name('event_images/benchmark.png', hashlib.sha256(data).hexdigest())
+
+        with tempfile.TemporaryDirectory() as media_root:
+            path = os.path.join(media_root, name)
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as f:
+                f.write(data)
+
+            url = f'{settings.MEDIA_URL}{name}'
+            # The previous setup: the project's URLs plus the DEBUG-only static() media route
+            static_urlconf = ModuleType('bench_media_urls')
+            static_urlconf.urlpatterns = [
+                re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$", serve, {'document_root': media_root}),
+            ] + urlpatterns
+            without_middleware = [m for m in settings.MIDDLEWARE if m != MEDIA_MIDDLEWARE]
+            modes = {
+                'static serve': {'MIDDLEWARE': without_middleware, 'ROOT_URLCONF': static_urlconf},
+                'middleware': {
+                    'MIDDLEWARE': settings.MIDDLEWARE if MEDIA_MIDDLEWARE in settings.MIDDLEWARE
+                    else [MEDIA_MIDDLEWARE] + without_middleware,
+                },
+            }
+
+            cases = {'full download': {}, 'revalidation': None, 'range (first 64 KB)': {'HTTP_RANGE': 'bytes=0-65535'}}
+            for label in cases:
+                results = []
+                for mode, overrides in modes.items():
+                    with override_settings(MEDIA_ROOT=media_root, ALLOWED_HOSTS=['testserver'], SERVE_MEDIA=True, **overrides):
+                        results.append((mode, *self._measure(url, cases[label], options['requests'])))
+                self.stdout.write(f'{label} ({url})')
+                for mode, rate, status, size in results:
+                    self.stdout.write(f'  {mode:<13} {rate:9.1f} req/s  status {status}, {size} bytes/response')
+                self.stdout.write(self.style.SUCCESS(f'  Speedup: {results[1][1] / results[0][1]:.1f}x'))
+
+    def _measure(self, url, headers, requests):
+        client = Client()
+        response = client.get(url)
+        if headers is None:
+            # Revalidate with both validators; static serve only understands If-Modified-Since
+            headers = {'HTTP_IF_NONE_MATCH': response.get('ETag', ''), 'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}
+
+        def fetch():
+            response = client.get(url, **headers)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            return response.status_code, len(body)
+
+        status, size = fetch()
+        start = time.perf_counter()
+        for _ in range(requests):
+            fetch()
+        return requests / (time.perf_counter() - start), status, size
@@ -0,0 +1,63 @@
+import math
+
+from django.core.management.base import BaseCommand
+
+from spark_bytes_app.benchmarks import rolled_back, seed_events, time_call, CAMPUS_LAT, CAMPUS_LNG
+from spark_bytes_app.geo import EARTH_RADIUS_KM, EventCoordinateIndex
+from spark_bytes_app.models import Event
+
+
+def orm_nearest(latitude, longitude, radius_km, k):
+    """
+    Row-by-row reference implementation: loads every geolocated upcoming event through
+    the ORM and computes the haversine distance in Python for each one.
+    """
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    matches = []
+    for event in Event.objects.upcoming().filter(latitude__isnull=False, longitude__isnull=False):
+        lat2, lng2 = math.radians(event.latitude), math.radians(event.longitude)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+        if distance <= radius_km:
+            matches.append((event.pk, distance))
+    matches.sort(key=lambda match: match[1])
+    return matches[:k]
+
+
+class Command(BaseCommand):
+    """
+    Compares the vectorized nearest-events index against the row-by-row ORM approach
+    on synthetic events. All seeded data is rolled back when the command finishes.
+
+    Usage:
+        python manage.py bench_nearby [--events 10000] [--k 10] [--radius 2] [--repeat 20]
+    """
+    help = 'Benchmarks the "events near me" index against a row-by-row ORM implementation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=10000, help='Number of synthetic events (default: 10000).')
+        parser.add_argument('--k', type=int, default=10, help='Number of nearest events to return (default: 10).')
+        parser.add_argument('--radius', type=float, default=2.0, help='Search radius in km (default: 2).')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed repetitions per implementation (default: 20).')
+
+    def handle(self, *args, **options):
+        origin = (sum(CAMPUS_LAT) / 2, sum(CAMPUS_LNG) / 2)
+        query = (origin[0], origin[1], options['radius'], options['k'])
+
+        with rolled_back():
+            seed_events(options['events'])
+            index = EventCoordinateIndex(max_age=float('inf'))
+            index.rebuild()
+
+            expected = [event_id for event_id, _ in orm_nearest(*query)]
+            actual = [event_id for event_id, _ in index.nearest(*query)]
+            if expected != actual:
+                self.stderr.write(self.style.WARNING('Index and ORM results differ.'))
+
+            orm = time_call(lambda: orm_nearest(*query), repeat=options['repeat'])
+            vectorized = time_call(lambda: index.nearest(*query), repeat=options['repeat'])
+
+        self.stdout.write(f"{options['events']} events, k={options['k']}, radius={options['radius']} km")
+        self.stdout.write(f"  ORM row-by-row: best {orm['best_ms']:.2f} ms, median {orm['median_ms']:.2f} ms")
+        self.stdout.write(f"  NumPy index:    best {vectorized['best_ms']:.2f} ms, median {vectorized['median_ms']:.2f} ms")
+        self.stdout.write(self.style.SUCCESS(f"  Speedup: {orm['median_ms'] / vectorized['median_ms']:.1f}x (median)"))
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import FileField
+from django.utils import timezone
+
+from spark_bytes_app.storage import content_addressed_name, hash_file, is_content_addressed
+from spark_bytes_app.utils import bump_events_cache_version
+
+
+def file_references():
+    """
+    Maps every stored file name that is not yet content-addressed (and is not a field default)
+    to the (model, field name) pairs referencing it.
+    """
+    references = defaultdict(list)
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if not isinstance(field, FileField):
+                continue
+            names = (
+                model._base_manager.exclude(**{field.name: ''})
+                .exclude(**{f'{field.name}__isnull': True})
+                .values_list(field.name, flat=True)
+                .distinct()
+            )
+            for name in names.iterator():
+                if name != field.default and not is_content_addressed(name):
+                    references[name].append((model, field.name))
+    return references
+
+
+class Command(BaseCommand):
+    """
+    Moves existing media to content-addressed names, collapsing identical files into one.
+
+    Each referenced file is hashed and moved to '<dir>/<hh>/<sha256><ext>' (or deleted if a
+    file with that content is already there), and every row pointing at the old name is
+    updated with one UPDATE per model field. The new file is in place before any row points
+    at it and the old one is removed only after the rows are updated, so an interrupted run
+    leaves at worst an unreferenced copy for `gc_media` to collect. Field defaults such as
+    Profile.img's 'default.jpg' are left alone.
+
+    Usage:
+        python manage.py dedupe_media [--dry-run]
+    """
+    help = 'Deduplicates existing media files by content hash and reports bytes saved.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without touching files or rows.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        verbosity = options['verbosity']
+        references = file_references()
+
+        moved = duplicates = missing = rows = saved_bytes = 0
+        claimed = set()  # content-addressed names created (or, in a dry run, planned) by this run
+        for name, fields in sorted(references.items()):
+            source = default_storage.path(name)
+            if not os.path.isfile(source):
+                missing += 1
+                continue
+            size = os.path.getsize(source)
+            target_name = content_addressed_name(name, hash_file(source))
+            target = default_storage.path(target_name)
+            duplicate = target_name in claimed or os.path.exists(target)
+            claimed.add(target_name)
+
+            if duplicate:
+                duplicates += 1
+                saved_bytes += size
+            else:
+                moved += 1
+            if verbosity >= 2:
+                action = 'duplicate of' if duplicate else '->'
+                self.stdout.write(f'{name} {action} {target_name} ({size} bytes)')
+            if dry_run:
+                continue
+
+            if not duplicate:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix='.dedupe-', dir=os.path.dirname(target))
+                os.close(fd)
+                shutil.copy2(source, tmp_path)
+                os.replace(tmp_path, target)
+            with transaction.atomic():
+                for model, field_name in fields:
+                    changes = {field_name: target_name}
+                    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                        changes['updated_at'] = timezone.now()  # Image URLs changed; let delta-sync clients refetch
+                    rows += model._base_manager.filter(**{field_name: name}).update(**changes)
+            os.remove(source)
+
+        if rows:
+            bump_events_cache_version()
+
+        verb = 'Would save' if dry_run else 'Saved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {saved_bytes} bytes ({saved_bytes / 1024 / 1024:.2f} MB): '
+            f'{moved} file(s) renamed, {duplicates} duplicate(s) removed, {rows} row(s) updated.'
+        ))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{missing} referenced file(s) are missing from MEDIA_ROOT and were skipped.'))
@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+
+STATE_FILENAME = '.gc_media_state.json'
+
+
+def referenced_media():
+    """
+    Collects the names of every file referenced by a FileField/ImageField (including field
+    defaults such as Profile.img's 'default.jpg') into a set for O(1) membership checks.
+    """
+    referenced = set()
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if not isinstance(field, FileField):
+                continue
+            if isinstance(field.default, str) and field.default:
+                referenced.add(field.default)
+            names = (
+                model._base_manager.exclude(**{field.name: ''})
+                .exclude(**{f'{field.name}__isnull': True})
+                .values_list(field.name, flat=True)
+                .distinct()
+            )
+            referenced.update(names.iterator())
+    return referenced
+
+
+def walk_media(root, skip):
+    """
+    Yields (relative path parts, absolute path) for every file under root, in sorted order
+    of path components. A stable order is what makes a saved cursor resumable.
+    """
+    def walk(directory, parts):
+        with os.scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                path = Path(entry.path)
+                if path in skip:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from walk(path, parts + (entry.name,))
+                elif entry.is_file(follow_symlinks=False):
+                    yield parts + (entry.name,), path
+
+    yield from walk(Path(root), ())
+
+
+class Command(BaseCommand):
+    """
+    Deletes (or quarantines) files under MEDIA_ROOT that no FileField/ImageField references,
+    such as images of deleted events and replaced profile pictures.
+
+    The scan is incremental: files are processed in chunks in a stable order and the position
+    is saved to a state file after every chunk, so an interrupted or --max-files limited run
+    picks up where it left off. Recently modified files are skipped so uploads whose database
+    row has not been committed yet are never touched.
+
+    Usage:
+        python manage.py gc_media [--dry-run] [--quarantine DIR] [--chunk-size 500]
+                                  [--max-files N] [--min-age 3600] [--reset]
+    """
+    help = 'Removes orphaned files from MEDIA_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report orphans without deleting or moving them.')
+        parser.add_argument('--quarantine', help='Move orphans into this directory instead of deleting them.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Files processed between checkpoints (default: 500).')
+        parser.add_argument('--max-files', type=int, help='Stop after scanning this many files; the next run resumes.')
+        parser.add_argument('--min-age', type=int, default=3600, help='Skip files modified less than this many seconds ago (default: 3600).')
+        parser.add_argument('--state-file', help=f'Checkpoint file (default: MEDIA_ROOT/{STATE_FILENAME}).')
+        parser.add_argument('--reset', action='store_true', help='Ignore any saved checkpoint and start from the beginning.')
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT).resolve()
+        state_path = Path(options['state_file'] or media_root / STATE_FILENAME).resolve()
+        quarantine = Path(options['quarantine']).resolve() if options['quarantine'] else None
+        dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+
+        state = {'cursor': None, 'scanned': 0, 'orphans': 0, 'reclaimed_bytes': 0}
+        if state_path.exists() and not options['reset']:
+            state.update(json.loads(state_path.read_text()))
+            self.stdout.write(f"Resuming after {state['cursor']}")
+        cursor = tuple(state['cursor'].split('/')) if state['cursor'] else None
+
+        referenced = referenced_media()
+        cutoff = time.time() - options['min_age']
+        skip = {state_path, quarantine}
+        verb = 'Would remove' if dry_run else ('Quarantined' if quarantine else 'Deleted')
+
+        scanned_this_run = 0
+        finished = True
+        chunk = []
+        for parts, path in walk_media(media_root, skip):
+            if cursor is not None and parts <= cursor:
+                continue
+            if options['max_files'] is not None and scanned_this_run >= options['max_files']:
+                finished = False
+                break
+            chunk.append((parts, path))
+            scanned_this_run += 1
+            if len(chunk) >= options['chunk_size']:
+                self._process_chunk(chunk, referenced, cutoff, quarantine, dry_run, verb, state)
+                if not dry_run:
+                    state_path.write_text(json.dumps(state))
+                chunk = []
+        if chunk:
+            self._process_chunk(chunk, referenced, cutoff, quarantine, dry_run, verb, state)
+
+        if dry_run:
+            pass
+        elif finished:
+            state_path.unlink(missing_ok=True)
+        else:
+            state_path.write_text(json.dumps(state))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {state['orphans']} orphaned file(s), reclaiming {state['reclaimed_bytes']} bytes "
+            f"({state['reclaimed_bytes'] / 1024 / 1024:.2f} MB) "
+            f"across {state['scanned']} scanned file(s)."
+        ))
+        if not finished:
+            self.stdout.write('Scan incomplete; run the command again to continue.')
+
+    def _process_chunk(self, chunk, referenced, cutoff, quarantine, dry_run, verb, state):
+        for parts, path in chunk:
+            name = '/'.join(parts)
+            state['cursor'] = name
+            state['scanned'] += 1
+            if name in referenced:
+                continue
+            stat = path.stat()
+            if stat.st_mtime > cutoff:
+                continue
+
+            state['orphans'] += 1
+            state['reclaimed_bytes'] += stat.st_size
+            if self.verbosity >= 2:
+                self.stdout.write(f'{verb} {name} ({stat.st_size} bytes)')
+            if dry_run:
+                continue
+            if quarantine:
+                target = quarantine.joinpath(*parts)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(path), target)
+            else:
+                path.unlink()
@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from spark_bytes_app.geocoding import geocode_many, normalize_location
+from spark_bytes_app.models import Event
+from spark_bytes_app.utils import bump_events_cache_version
+
+
+class Command(BaseCommand):
+    """
+    Backfills coordinates for events that have none, so they show up on the map.
+
+    Events are grouped by normalized location, so each distinct location is looked up once
+    (and not at all if it is already in the geocode cache), and every event sharing that
+    location is updated with a single UPDATE.
+
+    Usage:
+        python manage.py geocode_events [--dry-run]
+    """
+    help = 'Geocodes the locations of events without coordinates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Resolve locations and report results without updating any events.',
+        )
+
+    def handle(self, *args, **options):
+        missing = Event.objects.filter(
+            Q(latitude__isnull=True) | Q(longitude__isnull=True) | Q(latitude=0, longitude=0)
+        )
+        events_by_query = defaultdict(list)
+        for event_id, location in missing.values_list('pk', 'location').iterator():
+            events_by_query[normalize_location(location)].append(event_id)
+
+        results = geocode_many(events_by_query.keys())
+        resolved = {query: coordinates for query, coordinates in results.items() if coordinates}
+
+        updated = 0
+        if not options['dry_run']:
+            with transaction.atomic():
+                for query, (latitude, longitude) in resolved.items():
+                    updated += Event.objects.filter(pk__in=events_by_query[query]).update(
+                        latitude=latitude, longitude=longitude, updated_at=timezone.now()
+                    )
+            if updated:
+                bump_events_cache_version()
+
+        event_count = sum(len(event_ids) for event_ids in events_by_query.values())
+        unresolved = len(events_by_query) - len(resolved)
+        self.stdout.write(
+            f'{len(events_by_query)} distinct location(s) across {event_count} event(s) without coordinates; '
+            f'{len(resolved)} resolved, {unresolved} unresolved.'
+        )
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} event(s).'))
@@ -0,0 +1,81 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Runs in a fresh interpreter: what a worker does before it can serve its first request
+STARTUP_SCRIPT = """
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+
+class Command(BaseCommand):
+    """
+    Measures cold-start cost: starts fresh Python interpreters that set up Django and load the
+    URLconf (and with it every view module), like a worker does before its first request.
+
+    Reports the wall-clock startup time over several runs and a per-module breakdown from
+    `python -X importtime`, so heavy imports that should be deferred to first use stand out.
+
+    Usage:
+        python manage.py profile_startup [--repeat 5] [--top 25] [--module some.module ...]
+    """
+    help = 'Reports worker cold-start time and per-module import times.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Number of cold starts to time (default: 5).')
+        parser.add_argument('--top', type=int, default=25, help='Number of modules to list (default: 25).')
+        parser.add_argument(
+            '--module', action='append', default=[],
+            help='Also import this module after startup (repeatable), e.g. to measure a management command.',
+        )
+        parser.add_argument(
+            '--self-time', action='store_true',
+            help="Sort by each module's own import time instead of cumulative time.",
+        )
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT + ''.join(f'import {module}\n' for module in options['module'])
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+
+        wall_times = []
+        for _ in range(options['repeat']):
+            result = subprocess.run(
+                [sys.executable, '-W', 'ignore', '-c', f'import time; t = time.perf_counter()\n{script}\nprint(time.perf_counter() - t)'],
+                capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+            )
+            if result.returncode != 0:
+                self.stderr.write(result.stderr)
+                return
+            wall_times.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+
+        result = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        modules = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+
+        top_level_ms = sum(cumulative for _, _, cumulative, depth in modules if depth == 0)
+        self.stdout.write(
+            f'Cold start: median {statistics.median(wall_times):.1f} ms, best {min(wall_times):.1f} ms '
+            f'over {len(wall_times)} run(s); {len(modules)} modules imported ({top_level_ms:.1f} ms in imports).'
+        )
+
+        sort_index = 1 if options['self_time'] else 2
+        self.stdout.write(f"\n{'self ms':>9} {'cumul ms':>9}  module")
+        for name, self_ms, cumulative_ms, _ in sorted(modules, key=lambda m: -m[sort_index])[:options['top']]:
+            self.stdout.write(f'{self_ms:9.1f} {cumulative_ms:9.1f}  {name}')
@@ -0,0 +1,54 @@
+import math
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from spark_bytes_app.models import Event, EventPopularity, ReservationLog
+from spark_bytes_app.trending import log_weight
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the materialized trending scores by replaying the reservation log, to repair drift
+    (e.g. a crash between a reservation and its score update).
+
+    Every current reservation of an upcoming event counts from the time of its latest RESERVE
+    or PROMOTE log row, exactly as `record_popularity` counted it; cancelled reservations no
+    longer exist and so contribute nothing. Reservations older than the log count as made now.
+    Scores of past events are dropped.
+
+    Usage:
+        python manage.py recompute_trending
+    """
+    help = 'Recomputes the trending scores of upcoming events from the reservation log.'
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        Reservation = Event.reserved_by.through
+        reserved_at = (
+            ReservationLog.objects.filter(
+                event_id=OuterRef('event_id'), profile_id=OuterRef('profile_id'),
+                action__in=[ReservationLog.RESERVE, ReservationLog.PROMOTE],
+            ).order_by().values('event_id').annotate(latest=Max('created_at')).values('latest')
+        )
+        reservations = (
+            Reservation.objects.filter(event__in=Event.objects.upcoming())
+            .annotate(reserved_at=Subquery(reserved_at))
+            .values_list('event_id', 'reserved_at')
+        )
+
+        weights = defaultdict(list)
+        for event_id, at in reservations.iterator():
+            weights[event_id].append(log_weight(at or now))
+
+        rows = []
+        for event_id, xs in weights.items():
+            top = max(xs)  # log-sum-exp, shifted so nothing overflows
+            rows.append(EventPopularity(event_id=event_id, score=top + math.log(sum(math.exp(x - top) for x in xs))))
+        with transaction.atomic():
+            EventPopularity.objects.all().delete()
+            EventPopularity.objects.bulk_create(rows, batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed trending scores for {len(rows)} event(s).'))
@@ -0,0 +1,198 @@
+import json
+import platform
+from itertools import combinations
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+
+from spark_bytes.templatetags.custom_filters import jsonify
+from spark_bytes_app.benchmarks import count_queries, rolled_back, seed_events, time_interleaved
+from spark_bytes_app.filters import FILTER_PARAMS
+from spark_bytes_app.models import Event
+from spark_bytes_app.utils import generate_qr_code
+from spark_bytes_app.views import EventListView, EventMapView
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+# Differences below this are scheduler and timer noise, never regressions
+NOISE_FLOOR_MS = 0.5
+
+
+def filter_params(events):
+    """
+    Returns a value for every event list filter that matches at least one seeded event.
+    """
+    sample = events[len(events) // 2]
+    return {
+        'name': 'event 1',
+        'location': 'Building 1',
+        'date': timezone.localtime(sample.date).date().isoformat(),
+        'food_types': [sample.food_types],
+        'allergies': [sample.allergies],
+    }
+
+
+def view_for(view_class, params=None):
+    view = view_class()
+    view.setup(RequestFactory().get('/', params or {}))
+    return view
+
+
+def build_cases(events, full_event):
+    """
+    Returns {case name: zero-argument callable} for every benchmarked operation.
+    """
+    cases = {
+        'event_is_full': full_event.is_full,
+        'generate_qr_code': lambda: generate_qr_code(f'Reservation for {full_event.name}'),
+    }
+
+    rows = list(Event.objects.filter(pk__in=[event.pk for event in events[:500]]).values())
+    cases['jsonify[500 events]'] = lambda: jsonify(rows)
+
+    params = filter_params(events)
+    for size in range(len(FILTER_PARAMS) + 1):
+        for combo in combinations(FILTER_PARAMS, size):
+            view = view_for(EventListView, {param: params[param] for param in combo})
+            cases[f"event_list[{'+'.join(combo) or 'no filters'}]"] = lambda view=view: list(view.get_queryset())
+
+    map_view = view_for(EventMapView)
+    map_view.object_list = map_view.get_queryset()
+    cases['event_map_context'] = map_view.get_context_data
+    return cases
+
+
+def calibration_workload():
+    """
+    Fixed CPU-bound work timed next to every case, to tell a slower machine from slower code.
+    """
+    return sum(i * i for i in range(20000))
+
+
+def expected_ms(result, previous):
+    """
+    Returns the baseline median of a case scaled by how fast the machine is now compared with
+    when the baseline was saved, as measured by the calibration workload.
+    """
+    if not previous.get('calibration_ms') or not result.get('calibration_ms'):
+        return previous['median_ms']
+    return previous['median_ms'] * result['calibration_ms'] / previous['calibration_ms']
+
+
+def is_regression(result, previous, threshold):
+    """
+    Returns True if a case is slower than its (machine speed adjusted) baseline median by more
+    than both the threshold fraction and the absolute noise floor, or runs more queries.
+    """
+    expected = expected_ms(result, previous)
+    slowdown = result['median_ms'] - expected
+    slower = slowdown > expected * threshold and slowdown > NOISE_FLOOR_MS
+    return slower or result['queries'] > previous['queries']
+
+
+class Command(BaseCommand):
+    """
+    Micro-benchmarks the app's inner functions on seeded data and compares them with a stored
+    baseline, failing if any case got slower than the threshold allows or runs more queries.
+
+    Covers Event.is_full, generate_qr_code, the jsonify filter, EventListView.get_queryset
+    with every combination of filters, and EventMapView.get_context_data. Seeded data is
+    rolled back afterwards. Timings depend on the machine, so compare against a baseline
+    saved on the same machine (run with --save-baseline on the base branch first).
+
+    Cases are compared by their median time, which a single descheduled run cannot move, scaled
+    by a fixed calibration workload timed in alternation with the case, so a machine that is
+    busier or slower than when the baseline was saved does not look like a regression. A case
+    that looks slower is timed again (--retries) before it is reported, so only a slowdown that
+    reproduces fails the run.
+
+    Usage:
+        python manage.py run_benchmarks [--events 1000] [--repeat 50] [--retries 2] [--threshold 0.25]
+                                        [--filter event_list] [--baseline PATH] [--save-baseline]
+    """
+    help = 'Runs the micro-benchmark suite and checks it against the stored baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Number of seeded events (default: 1000).')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed repetitions per case (default: 50).')
+        parser.add_argument('--retries', type=int, default=2, help='Times a case that looks slower is re-timed before failing (default: 2).')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown of the median as a fraction of the baseline (default: 0.25).')
+        parser.add_argument('--filter', help='Only run cases whose name contains this text.')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help=f'Baseline file (default: {DEFAULT_BASELINE}).')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to the baseline file instead of comparing.')
+
+    def measure(self, func, repeat):
+        calibration, timing = time_interleaved([calibration_workload, func], repeat=repeat)
+        return {
+            'best_ms': round(timing['best_ms'], 4),
+            'median_ms': round(timing['median_ms'], 4),
+            'calibration_ms': round(calibration['median_ms'], 4),
+            'queries': count_queries(func),
+        }
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options['baseline'])
+        baseline = {}
+        if not options['save_baseline']:
+            baseline = json.loads(baseline_path.read_text())['results'] if baseline_path.exists() else {}
+            if not baseline:
+                self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}; run with --save-baseline first.'))
+
+        results = {}
+        with rolled_back():
+            events = seed_events(options['events'])
+            full_event = seed_events(1, reservations=50, seed=1)[0]
+            for name, func in build_cases(events, full_event).items():
+                if options['filter'] and options['filter'] not in name:
+                    continue
+                result = self.measure(func, options['repeat'])
+                previous = baseline.get(name)
+                for _ in range(options['retries']):
+                    if not previous or not is_regression(result, previous, options['threshold']):
+                        break
+                    retry = self.measure(func, options['repeat'])
+                    if retry['median_ms'] / retry['calibration_ms'] < result['median_ms'] / result['calibration_ms']:
+                        result = retry
+                results[name] = result
+
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({
+                'meta': {
+                    'events': options['events'],
+                    'repeat': options['repeat'],
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                },
+                'results': results,
+            }, indent=2, sort_keys=True) + '\n')
+            for name, result in results.items():
+                self.stdout.write(f"{name:<60} {result['median_ms']:>10.3f} ms {result['queries']:>3} queries")
+            self.stdout.write(self.style.SUCCESS(f'Saved {len(results)} baseline result(s) to {baseline_path}.'))
+            return
+
+        regressions = []
+        self.stdout.write(f"{'case':<60} {'median ms':>10} {'expected':>10} {'change':>8} {'queries':>8}")
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                self.stdout.write(f"{name:<60} {result['median_ms']:>10.3f} {'-':>10} {'new':>8} {result['queries']:>8}")
+                continue
+            expected = expected_ms(result, previous)
+            change = result['median_ms'] / expected - 1 if expected else 0
+            line = (
+                f"{name:<60} {result['median_ms']:>10.3f} {expected:>10.3f} {change:>+8.0%} "
+                f"{result['queries']:>3} ({previous['queries']})"
+            )
+            if is_regression(result, previous, options['threshold']):
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} benchmark(s) within {options["threshold"]:.0%} of the baseline.'))
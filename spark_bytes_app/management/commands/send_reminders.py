@@ -0,0 +1,122 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from spark_bytes_app.models import Event, ReservationReminder
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Emails every attendee one digest of their reservations for events starting in the next N hours.
+
+    All due reservations are selected in one query (excluding ones already reminded about),
+    grouped per profile, and the digest template is rendered once per recipient. Messages are
+    sent over a single SMTP connection. Each recipient's reservations are recorded in
+    ReservationReminder just *before* their message is sent and the records are removed again
+    if it fails, so a failed or interrupted run can simply be re-run: nothing is sent twice, and
+    only the recipients whose messages failed or were never attempted are retried. A process
+    killed outright leaves at most the one message in flight recorded as sent.
+
+    Usage:
+        python manage.py send_reminders [--hours 24] [--dry-run]
+    """
+    help = 'Sends reminder digests for reservations at upcoming events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Remind about events starting within this many hours (default: 24).')
+        parser.add_argument('--dry-run', action='store_true', help='Report who would be reminded without sending anything.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        Reservation = Event.reserved_by.through
+        already_reminded = ReservationReminder.objects.filter(
+            event_id=OuterRef('event_id'), profile_id=OuterRef('profile_id')
+        )
+        reservations = (
+            Reservation.objects
+            .filter(event__archived=False, event__date__gte=now, event__date__lt=now + timedelta(hours=options['hours']))
+            .exclude(Exists(already_reminded))
+            .select_related('event', 'profile__user')
+            .order_by('profile_id', 'event__date')
+        )
+        digests = []
+        for _, group in groupby(reservations, key=lambda reservation: reservation.profile_id):
+            group = list(group)
+            profile = group[0].profile
+            if profile.user.email:
+                digests.append((profile, [reservation.event for reservation in group]))
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(digests)} reminder digest(s) would be sent.')
+            return
+
+        sent = failed = 0
+        connection = get_connection()
+        try:
+            connection.open()
+            for profile, events in digests:
+                # Claim before sending: if the process dies mid-send, nobody is reminded twice
+                ReservationReminder.objects.bulk_create([
+                    ReservationReminder(event=event, profile=profile) for event in events
+                ], ignore_conflicts=True)
+                try:
+                    connection.send_messages([self._build_message(profile, events)])
+                except Exception as e:
+                    logger.error(f"Failed to send reminder to {profile.user.email}: {str(e)}")
+                    failed += 1
+                    ReservationReminder.objects.filter(profile=profile, event__in=events).delete()
+                    if not self._reconnect(connection):
+                        break
+                else:
+                    sent += 1
+        finally:
+            connection.close()
+
+        skipped = len(digests) - sent - failed
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent} reminder digest(s); {failed} failed'
+            + (f', {skipped} not attempted.' if skipped else '.')
+        ))
+        if failed or skipped:
+            self.stdout.write('Re-run the command to retry the remaining recipients.')
+
+    def _reconnect(self, connection):
+        """
+        Replaces a connection that may be broken after an SMTP error. Returns False if the
+        mail server cannot be reached, in which case the remaining recipients are left for the next run.
+        """
+        try:
+            connection.close()
+            connection.open()
+        except Exception as e:
+            logger.error(f"Could not reconnect to the mail server: {str(e)}")
+            return False
+        return True
+
+    def _build_message(self, profile, events):
+        """
+        Renders the digest for one recipient.
+        """
+        html_content = render_to_string('spark_bytes/email/reminder_digest.html', {
+            'profile': profile,
+            'events': events,
+        })
+        subject = (
+            f'Reminder: {events[0].name}' if len(events) == 1
+            else f'Reminder: {len(events)} upcoming reservations'
+        )
+        email = EmailMultiAlternatives(
+            subject, strip_tags(html_content), settings.DEFAULT_FROM_EMAIL, [profile.user.email]
+        )
+        email.attach_alternative(html_content, 'text/html')
+        return email
@@ -0,0 +1,238 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, HttpResponseNotFound
+from django.urls import Resolver404, resolve
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from .filters import filter_cache_key
+from .storage import is_content_addressed
+from .utils import events_cache_version
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serves public, read-only pages to anonymous visitors from a full-page cache.
+
+    Must be placed before SessionMiddleware and AuthenticationMiddleware. A request is eligible
+    when it is a GET for one of `settings.ANONYMOUS_PAGE_CACHE_URL_NAMES` and carries no session
+    cookie, i.e. the visitor cannot be logged in. Cache hits are returned straight away, so they
+    never load a session, resolve a user, run context processors or render a template.
+
+    Misses go through the normal stack and the response is stored if it is a plain 200 that sets
+    no cookies (so e.g. pages that issued a CSRF token are never shared). Keys are built from the
+    path and the event filter parameters only, so tracking parameters or a reordered query string
+    cannot fill the cache with copies of one page. They also include the events cache version, so
+    every cached page is dropped as soon as an event or reservation changes.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._is_eligible(request):
+            return self.get_response(request)
+
+        key = self._cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            cache.set(key, response, settings.ANONYMOUS_PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    def _is_eligible(self, request):
+        if request.method != 'GET' or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.url_name in settings.ANONYMOUS_PAGE_CACHE_URL_NAMES
+
+    def _cache_key(self, request):
+        path = hashlib.md5(request.path.encode()).hexdigest()
+        return filter_cache_key(f'anonymous_page:v{events_cache_version()}:{path}', request.GET)
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles a single request when a staff user asks for it with the `X-Profile` header or a
+    `_profile` query parameter, and stores the capture (see `profiling.py`).
+
+    Must be placed after AuthenticationMiddleware. Other requests only pay for a header lookup
+    and a substring check on the raw query string, and the middleware removes itself from the
+    stack entirely when `settings.REQUEST_PROFILER_ENABLED` is False.
+    """
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._is_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+
+        from .profiling import profile_call, save_capture
+
+        response, profiler, stacks, duration = profile_call(self.get_response, request)
+        response['X-Profile-Id'] = save_capture(request, response, profiler, stacks, duration)
+        return response
+
+    def _is_requested(self, request):
+        return 'HTTP_X_PROFILE' in request.META or (
+            '_profile' in request.META.get('QUERY_STRING', '') and '_profile' in request.GET
+        )
+
+
+class RangeFile:
+    """
+    File wrapper that reads at most `length` bytes starting at `start`.
+
+    It keeps `fileno()` and `tell()`, so servers whose wsgi.file_wrapper uses sendfile (e.g.
+    gunicorn) still send the range zero-copy, bounded by the Content-Length header.
+    """
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class MediaFileMiddleware:
+    """
+    Serves files under MEDIA_ROOT at MEDIA_URL without going through sessions, auth or URL routing.
+
+    Must be placed before SessionMiddleware. Responses carry an ETag and Last-Modified, so
+    revalidation returns 304, and support single HTTP byte ranges (206/416). Content-addressed
+    names (see `storage.py`) never change content and are cached for a year as immutable;
+    anything else gets `settings.MEDIA_CACHE_MAX_AGE`. Bodies are FileResponses, which WSGI
+    servers with a sendfile-capable wsgi.file_wrapper send zero-copy.
+
+    Removed from the stack when `settings.SERVE_MEDIA` is False (e.g. when a web server or CDN
+    serves MEDIA_ROOT directly).
+    """
+    def __init__(self, get_response):
+        if not settings.SERVE_MEDIA or not settings.MEDIA_URL.startswith('/'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.MEDIA_URL
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+        name = posixpath.normpath(request.path_info[len(self.prefix):]).lstrip('/')
+        if not name or any(part.startswith('.') for part in name.split('/')):
+            # Hidden files are bookkeeping (gc_media state, in-flight uploads), never media
+            return HttpResponseNotFound()
+        try:
+            path = safe_join(settings.MEDIA_ROOT, name)
+            stat = os.stat(path)
+        except (SuspiciousFileOperation, OSError, ValueError):
+            # ValueError: the name contains a null byte
+            return HttpResponseNotFound()
+        if not os.path.isfile(path):
+            return HttpResponseNotFound()
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = int(stat.st_mtime)
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(last_modified),
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': (
+                'public, max-age=31536000, immutable' if is_content_addressed(name)
+                else f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+            ),
+        }
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if conditional is not None:
+            for header, value in headers.items():
+                conditional[header] = value
+            return conditional
+
+        byte_range = self._byte_range(request, etag, last_modified, stat.st_size)
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+            response['Content-Length'] = stat.st_size
+        elif byte_range:
+            start, end = byte_range
+            response = FileResponse(
+                RangeFile(open(path, 'rb'), start, end - start + 1), status=206, content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def _byte_range(self, request, etag, last_modified, size):
+        """
+        Returns (start, end) for a satisfiable single byte range, 'unsatisfiable', or None to send the whole file.
+        Multiple ranges, malformed ranges (including last < first) and ranges invalidated by If-Range are
+        answered with the whole file.
+        """
+        header = request.META.get('HTTP_RANGE')
+        if not header:
+            return None
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+            return None
+        match = RANGE_RE.match(header.strip())
+        if not match:
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            return None
+        if start >= size or start > end:
+            return 'unsatisfiable'
+        return start, end
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0008_event_waitlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='location',
+            field=models.CharField(db_index=True, default='Default Location', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='buid',
+            field=models.CharField(db_index=True, max_length=8),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0009_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='archived',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['archived', 'date'], name='event_archived_date_idx'),
+        ),
+    ]
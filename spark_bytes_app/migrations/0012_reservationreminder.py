@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0011_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='spark_bytes_app.event')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='spark_bytes_app.profile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reservationreminder',
+            constraint=models.UniqueConstraint(fields=('event', 'profile'), name='unique_reservation_reminder'),
+        ),
+    ]
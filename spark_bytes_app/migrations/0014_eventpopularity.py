@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0013_event_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventPopularity',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='spark_bytes_app.event')),
+                ('score', models.FloatField(db_index=True, default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0014_eventpopularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('reserve', 'Reserved'), ('promote', 'Promoted from waitlist'), ('cancel', 'Cancelled')], max_length=10)),
+                ('occupancy', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservation_log', to='spark_bytes_app.event')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservation_log', to='spark_bytes_app.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'created_at'], name='reservation_log_event_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0015_reservationlog'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservationlog',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservation_log', to='spark_bytes_app.event'),
+        ),
+        migrations.AlterField(
+            model_name='reservationlog',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservation_log', to='spark_bytes_app.profile'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0016_reservationlog_keep_history'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:54
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spark_bytes_app', '0017_remove_event_archived_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='location',
+            field=models.CharField(default='Default Location', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='buid',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='event_name_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.comparison.Collate('location', 'NOCASE'), name='event_location_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(django.db.models.functions.comparison.Collate('buid', 'NOCASE'), name='profile_buid_nocase_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Collate
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Profile(models.Model):
     """
@@ -14,6 +20,12 @@ class Profile(models.Model):
     buid = models.CharField(max_length=8)  # Boston University ID (BUID)
     img = models.ImageField(upload_to='profile_pics/', default='default.jpg')  # Profile picture
 
+    class Meta:
+        indexes = [
+            # Serves the admin's case-insensitive BUID search (see Event.Meta)
+            models.Index(Collate('buid', 'NOCASE'), name='profile_buid_nocase_idx'),
+        ]
+
     def __str__(self):
         """
         Returns the username as the string representation of the Profile.
@@ -21,6 +33,33 @@ class Profile(models.Model):
         return f'{self.user.username} Profile'
 
 
+def grace_cutoff():
+    """
+    Returns the start time before which an event counts as over.
+    """
+    return timezone.now() - timedelta(hours=settings.EVENT_GRACE_HOURS)
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    QuerySet for events with shortcuts for the upcoming (hot) and past (archived) sets.
+    """
+    def upcoming(self):
+        """
+        Returns events that are not archived and have not happened yet, including events that
+        started less than `settings.EVENT_GRACE_HOURS` ago and may still be going on.
+        Served by the (archived, date) index.
+        """
+        return self.filter(archived=False, date__gte=grace_cutoff())
+
+    def past(self):
+        """
+        Returns archived events and events that started more than `settings.EVENT_GRACE_HOURS`
+        ago but have not been archived yet; exactly the events `upcoming()` leaves out.
+        """
+        return self.filter(Q(archived=True) | Q(date__lt=grace_cutoff()))
+
+
 class Event(models.Model):
     """
     Represents an event created by a user.
@@ -39,6 +78,9 @@ class Event(models.Model):
         reservation_limit (int): Maximum number of reservations allowed for the event.
         latitude (float): Optional latitude of the event location.
         longitude (float): Optional longitude of the event location.
+        waitlist_counter (int): Last position handed out on the event's waitlist.
+        archived (bool): Whether the event has been moved out of the upcoming set by `archive_events`.
+        updated_at (datetime): When the event or its reservations last changed; the delta-sync high-water mark.
     """
     # Choices for food types
     FOOD_TYPES = [
@@ -80,7 +122,7 @@ class Event(models.Model):
     description = models.TextField(blank=True, null=True, help_text="Event description (optional)")
     img = models.ImageField(upload_to='event_images/', blank=True, null=True)  # Event image
     location = models.CharField(max_length=255, default="Default Location")  # Location of the event
-    date = models.DateTimeField()  # Date and time of the event
+    date = models.DateTimeField(db_index=True)  # Date and time of the event
     food_items = models.TextField(blank=True, null=True, help_text="List of food items available at the event")
     food_types = models.CharField(
         max_length=50, choices=FOOD_TYPES, blank=True, null=True, help_text="Select the type of food available."
@@ -96,6 +138,20 @@ class Event(models.Model):
     )
     latitude = models.FloatField(blank=True, null=True)  # Latitude of the event location
     longitude = models.FloatField(blank=True, null=True)  # Longitude of the event location
+    waitlist_counter = models.PositiveIntegerField(default=0, editable=False)  # Last waitlist position issued
+    archived = models.BooleanField(default=False)  # Past event moved out of the hot set
+    # Bulk .update() calls bypass auto_now, so they must set updated_at explicitly
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Last change, for delta sync
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['archived', 'date'], name='event_archived_date_idx'),
+            # SQLite only uses NOCASE indexes for the case-insensitive LIKE of admin searches
+            models.Index(Collate('name', 'NOCASE'), name='event_name_nocase_idx'),
+            models.Index(Collate('location', 'NOCASE'), name='event_location_nocase_idx'),
+        ]
 
     def is_full(self):
         """
@@ -106,6 +162,86 @@ class Event(models.Model):
         """
         return self.reserved_by.count() >= self.reservation_limit
 
+    def join_waitlist(self, profile):
+        """
+        Appends a profile to the end of the event's waitlist.
+
+        The position is taken from a per-event counter, so joining costs the same
+        regardless of how long the waitlist already is.
+
+        Args:
+            profile (Profile): The profile joining the waitlist.
+
+        Returns:
+            WaitlistEntry: The newly created waitlist entry.
+        """
+        with transaction.atomic():
+            Event.objects.filter(pk=self.pk).update(waitlist_counter=F('waitlist_counter') + 1)
+            position = Event.objects.filter(pk=self.pk).values_list('waitlist_counter', flat=True).get()
+            return WaitlistEntry.objects.create(event=self, profile=profile, position=position)
+
+    def promote_waitlist(self):
+        """
+        Moves as many waitlisted profiles as there are free spots into the reservation list,
+        in the order they joined, and queues one notification for each promoted profile.
+
+        Returns:
+            list[Profile]: The promoted profiles, in waitlist order.
+        """
+        if not self.waitlist_entries.exists():
+            return []
+
+        with transaction.atomic():
+            event = Event.objects.select_for_update().get(pk=self.pk)
+            free_spots = event.reservation_limit - event.reserved_by.count()
+            if free_spots <= 0:
+                return []
+
+            entries = list(
+                event.waitlist_entries.select_related('profile').order_by('position')[:free_spots]
+            )
+            if not entries:
+                return []
+
+            # Insert through rows directly so the promotion does not re-trigger m2m_changed
+            Reservation = Event.reserved_by.through
+            Reservation.objects.bulk_create(
+                [Reservation(event_id=event.pk, profile_id=entry.profile_id) for entry in entries],
+                ignore_conflicts=True,
+            )
+            WaitlistEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+
+            occupancy = event.reservation_limit - free_spots
+            log_rows = ReservationLog.objects.bulk_create([
+                ReservationLog(
+                    event_id=event.pk, profile_id=entry.profile_id,
+                    action=ReservationLog.PROMOTE, occupancy=occupancy + i + 1,
+                )
+                for i, entry in enumerate(entries)
+            ])
+
+            from .trending import record_logged_reservations  # Imported here to avoid a circular import
+            record_logged_reservations(log_rows)
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    profile=entry.profile,
+                    event=event,
+                    subject=f'You have a spot at {event.name}',
+                    message=(
+                        f'A spot opened up for {event.name} on {event.date:%B %d, %Y at %I:%M %p} '
+                        f'at {event.location}. You have been moved off the waitlist and your '
+                        f'reservation is confirmed.'
+                    ),
+                )
+                for entry in entries
+            ])
+
+            from .utils import send_notifications  # Imported here to avoid a circular import
+            notification_ids = [notification.pk for notification in notifications]
+            transaction.on_commit(lambda: send_notifications(notification_ids))
+
+        return [entry.profile for entry in entries]
+
     def __str__(self):
         """
         Returns a string representation of the event.
@@ -113,4 +249,211 @@ class Event(models.Model):
         Format:
             "Event: [event name] by [creator's username]"
         """
-        return f"Event: {self.name} by {self.created_by.user.username}"
\ No newline at end of file
+        return f"Event: {self.name} by {self.created_by.user.username}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A profile waiting for a spot at a full event.
+
+    Attributes:
+        event (Event): The event being waited on.
+        profile (Profile): The profile on the waitlist.
+        position (int): Ordering key within the event's waitlist; lower positions are promoted first.
+        created_at (datetime): When the profile joined the waitlist.
+    """
+    event = models.ForeignKey('Event', on_delete=models.CASCADE, related_name='waitlist_entries')
+    profile = models.ForeignKey('Profile', on_delete=models.CASCADE, related_name='waitlist_entries')
+    position = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['event', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'profile'], name='unique_waitlist_profile'),
+            models.UniqueConstraint(fields=['event', 'position'], name='unique_waitlist_position'),
+        ]
+
+    def get_place(self):
+        """
+        Returns the 1-based place of this entry in the event's current waitlist.
+        """
+        return WaitlistEntry.objects.filter(event_id=self.event_id, position__lt=self.position).count() + 1
+
+    def __str__(self):
+        """
+        Returns a string representation of the waitlist entry.
+        """
+        return f'{self.profile.user.username} waiting for {self.event.name} (#{self.position})'
+
+
+class Notification(models.Model):
+    """
+    A queued message for a user, delivered by email once the transaction that created it commits.
+
+    Attributes:
+        profile (Profile): The recipient.
+        event (Event): Optional event the notification is about.
+        subject (str): Email subject line.
+        message (str): Plain-text message body.
+        created_at (datetime): When the notification was queued.
+        sent_at (datetime): When the notification was delivered, or None while pending.
+    """
+    profile = models.ForeignKey('Profile', on_delete=models.CASCADE, related_name='notifications')
+    event = models.ForeignKey('Event', on_delete=models.CASCADE, related_name='notifications', blank=True, null=True)
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the notification.
+        """
+        return f'Notification for {self.profile.user.username}: {self.subject}'
+
+
+class GeocodeCache(models.Model):
+    """
+    Cached result of geocoding a location string.
+
+    Attributes:
+        query (str): The normalized location string (see `geocoding.normalize_location`).
+        latitude (float): Resolved latitude, or None if the provider found nothing.
+        longitude (float): Resolved longitude, or None if the provider found nothing.
+        provider (str): Name of the provider that produced the result.
+        created_at (datetime): When the location was geocoded.
+    """
+    query = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    provider = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def coordinates(self):
+        """
+        Returns (latitude, longitude), or None for a cached miss.
+        """
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+    def __str__(self):
+        """
+        Returns a string representation of the cached geocode.
+        """
+        return f'{self.query} -> {self.coordinates}'
+
+
+class ReservationReminder(models.Model):
+    """
+    Records that a reminder for a reservation has been handed to the mail server,
+    so the reminder digest never mentions the same reservation twice.
+
+    Attributes:
+        event (Event): The reserved event.
+        profile (Profile): The profile holding the reservation.
+        sent_at (datetime): When the reminder was sent.
+    """
+    event = models.ForeignKey('Event', on_delete=models.CASCADE, related_name='reminders')
+    profile = models.ForeignKey('Profile', on_delete=models.CASCADE, related_name='reminders')
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'profile'], name='unique_reservation_reminder'),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the reminder.
+        """
+        return f'Reminder for {self.profile.user.username} about {self.event.name}'
+
+
+class EventDeletion(models.Model):
+    """
+    Tombstone for a deleted event, so delta-sync clients can drop it. Rows are written by a
+    post_delete signal and pruned by `archive_events` after `settings.EVENT_SYNC_TOMBSTONE_DAYS`.
+
+    Attributes:
+        event_id (int): The id of the deleted event.
+        deleted_at (datetime): When the event was deleted.
+    """
+    event_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the tombstone.
+        """
+        return f'Event {self.event_id} deleted at {self.deleted_at}'
+
+
+class EventPopularity(models.Model):
+    """
+    Materialized, time-decayed popularity of an event, maintained incrementally by `trending.record_popularity`.
+
+    The score is stored in log space: score = ln(sum of e^(t / tau)) over reservations made at
+    times t (in seconds), so every reservation counts as much as the ones before it at the moment
+    it is made and then decays with a half-life of `settings.TRENDING_HALF_LIFE_HOURS`. Ordering
+    by score therefore orders by current decayed popularity without ever rewriting old rows.
+
+    Attributes:
+        event (Event): The event the score belongs to.
+        score (float): Log of the decayed reservation weight; 0 means no weight.
+        updated_at (datetime): When the score last changed.
+    """
+    event = models.OneToOneField('Event', on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    score = models.FloatField(default=0.0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the popularity row.
+        """
+        return f'{self.event.name}: {self.score:.3f}'
+
+
+class ReservationLog(models.Model):
+    """
+    Append-only history of reservations: one row per reservation, promotion off the waitlist
+    or cancellation, with the event's occupancy right after it. Indexed by (event, created_at),
+    so an event's occupancy over time is a single range scan. Rows are never updated, and
+    outlive the event and profile they refer to.
+
+    Attributes:
+        event (Event): The event whose reservations changed, or None once it is deleted.
+        profile (Profile): The profile that reserved, was promoted or cancelled, or None once it is deleted.
+        action (str): One of RESERVE, PROMOTE or CANCEL.
+        occupancy (int): Number of reservations for the event after the action.
+        created_at (datetime): When the action happened.
+    """
+    RESERVE = 'reserve'
+    PROMOTE = 'promote'
+    CANCEL = 'cancel'
+    ACTIONS = [
+        (RESERVE, 'Reserved'),
+        (PROMOTE, 'Promoted from waitlist'),
+        (CANCEL, 'Cancelled'),
+    ]
+
+    event = models.ForeignKey('Event', on_delete=models.SET_NULL, null=True, related_name='reservation_log')
+    profile = models.ForeignKey('Profile', on_delete=models.SET_NULL, null=True, related_name='reservation_log')
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    occupancy = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'created_at'], name='reservation_log_event_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the log entry.
+        """
+        username = self.profile.user.username if self.profile else '(deleted profile)'
+        event_name = self.event.name if self.event else '(deleted event)'
+        return f'{username} {self.action} {event_name} ({self.occupancy})'
@@ -0,0 +1,151 @@
+"""
+On-demand request profiling for staff.
+
+A profiled request runs under cProfile while a background thread samples its stack, and the
+capture is written to `settings.REQUEST_PROFILE_DIR` as three files sharing one id:
+
+    <id>.prof       pstats data (`python -m pstats`, snakeviz, ...)
+    <id>.collapsed  folded stacks, one 'frame;frame;frame count' line per stack
+                    (flamegraph.pl, speedscope, inferno)
+    <id>.json       request path, method, status and duration
+
+Only the newest `settings.REQUEST_PROFILE_KEEP` captures are kept.
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+CAPTURE_ID_RE = re.compile(r'^\d+-[\w-]+$')
+CAPTURE_EXTENSIONS = ('.prof', '.collapsed', '.json')
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of one thread at a fixed interval and counts identical stacks.
+    """
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def profile_call(func, *args):
+    """
+    Calls func under cProfile and the stack sampler.
+
+    Returns:
+        tuple: (func's result, cProfile.Profile, Counter of collapsed stacks, duration in seconds)
+    """
+    sampler = StackSampler(threading.get_ident(), settings.REQUEST_PROFILE_INTERVAL)
+    profiler = cProfile.Profile()
+    sampler.start()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+        duration = time.perf_counter() - start
+        sampler.stop()
+    return result, profiler, sampler.stacks, duration
+
+
+def save_capture(request, response, profiler, stacks, duration):
+    """
+    Writes a capture to the profile directory and drops the oldest ones beyond the limit.
+
+    Returns:
+        str: The capture id.
+    """
+    directory = settings.REQUEST_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r'[^\w]+', '-', request.path).strip('-')[:60] or 'root'
+    capture_id = f'{time.time_ns()}-{request.method.lower()}-{slug}'
+    base = os.path.join(directory, capture_id)
+
+    profiler.dump_stats(base + '.prof')
+    with open(base + '.collapsed', 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+    with open(base + '.json', 'w') as f:
+        json.dump({
+            'path': request.get_full_path(),
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'samples': sum(stacks.values()),
+            'user': request.user.get_username(),
+        }, f)
+
+    for old_id in capture_ids()[settings.REQUEST_PROFILE_KEEP:]:
+        for ext in CAPTURE_EXTENSIONS:
+            try:
+                os.remove(os.path.join(directory, old_id + ext))
+            except FileNotFoundError:
+                pass
+    return capture_id
+
+
+def capture_ids():
+    """
+    Returns the ids of stored captures, newest first.
+    """
+    try:
+        names = os.listdir(settings.REQUEST_PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    ids = {name[:-len('.json')] for name in names if name.endswith('.json')}
+    return sorted(ids, key=lambda capture_id: int(capture_id.split('-', 1)[0]), reverse=True)
+
+
+def list_captures():
+    """
+    Returns the metadata of stored captures, newest first.
+    """
+    captures = []
+    for capture_id in capture_ids():
+        try:
+            with open(os.path.join(settings.REQUEST_PROFILE_DIR, capture_id + '.json')) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        meta['id'] = capture_id
+        meta['captured_at'] = datetime.fromtimestamp(int(capture_id.split('-', 1)[0]) / 1e9, tz=timezone.utc)
+        captures.append(meta)
+    return captures
+
+
+def capture_path(capture_id, ext):
+    """
+    Returns the path of one file of a capture, or None if the id or extension is not valid.
+    """
+    if not CAPTURE_ID_RE.match(capture_id) or ext not in CAPTURE_EXTENSIONS:
+        return None
+    path = os.path.join(settings.REQUEST_PROFILE_DIR, capture_id + ext)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,213 @@
+"""
+Admission control for write-heavy endpoints.
+
+Each client gets a token bucket per endpoint scope, keyed by user and/or IP address and stored
+in Django's cache backend. A bucket holds up to `limit` tokens and regains one every
+`period / limit` seconds, so a client can burst `limit` requests but never sustain more than
+the configured rate, including across window boundaries. Buckets are implemented with the
+generic cell rate algorithm (GCRA): each stores a single timestamp, the time at which it would
+be full again, in integer microseconds, so taking a token is an atomic `add`/`incr` (undone
+with `decr` if the bucket turns out to be empty) and idle buckets simply expire.
+
+A request must get a token from every bucket that applies to it (per IP, per user); all of
+them are checked before any is charged, so a request rejected by one bucket does not use up
+the others. The IP bucket is checked before the session is loaded, so a flood from one address
+is turned away without touching the database. Excess requests are rejected with
+`429 Too Many Requests` and a `Retry-After` header before the view (and therefore any ORM
+work) runs.
+
+Admitted/rejected counters are spread over several shard keys per scope so concurrent workers
+do not all increment the same cache key; `rate_limit_counters()` sums the shards.
+"""
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import JsonResponse
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+COUNTER_SHARDS = 8
+
+_scopes = set()
+
+
+def parse_rate(rate):
+    """
+    Parses a rate such as '10/m' into (limit, period in seconds).
+    """
+    limit, period = rate.split('/')
+    return int(limit), RATE_PERIODS[period[0]]
+
+
+def client_ip(request):
+    """
+    Returns the client's IP address, trusting X-Forwarded-For only when configured to
+    (i.e. when the app runs behind a reverse proxy that sets it).
+    """
+    if settings.RATELIMIT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def session_user_id(request):
+    """
+    Returns the logged-in user's id straight from the session, without loading the User row.
+    """
+    session = getattr(request, 'session', None)
+    return session.get(SESSION_KEY) if session is not None else None
+
+
+def _bucket(name, rate):
+    """
+    Returns (cache key, emission interval, burst tolerance) in microseconds for a bucket.
+    """
+    limit, period = parse_rate(rate)
+    interval = period * 1_000_000 // limit
+    return f'ratelimit:{name}', interval, interval * limit
+
+
+def _retry_after(buckets, now):
+    """
+    Returns how many seconds until every bucket has a token, reading them without charging.
+    """
+    stored = cache.get_many([key for key, _, _ in buckets])
+    wait = 0
+    for key, interval, tolerance in buckets:
+        full_at = max(stored.get(key, now), now)
+        wait = max(wait, full_at + interval - tolerance - now)
+    return wait / 1_000_000
+
+
+def _charge(key, interval, tolerance, now):
+    """
+    Takes one token from a bucket. Returns 0 if it was granted, otherwise the seconds until it is.
+    """
+    timeout = math.ceil(tolerance / 1_000_000) + 1
+    if cache.add(key, now + interval, timeout=timeout):
+        return 0
+    try:
+        full_at = cache.incr(key, interval)
+    except ValueError:  # The bucket expired between add() and incr()
+        cache.set(key, now + interval, timeout=timeout)
+        return 0
+    if full_at - interval < now:
+        # The bucket had filled up again; restart it from now
+        cache.set(key, now + interval, timeout=timeout)
+        return 0
+    if full_at - now > tolerance:
+        try:
+            cache.decr(key, interval)
+        except ValueError:
+            pass
+        return (full_at - tolerance - now) / 1_000_000
+    cache.touch(key, timeout=math.ceil((full_at - now) / 1_000_000) + 1)
+    return 0
+
+
+def take_tokens(buckets):
+    """
+    Takes one token from each of several buckets, or from none of them.
+
+    Args:
+        buckets (list[tuple[str, str]]): (bucket identifier, rate) pairs, e.g. ('reserve:user:42', '10/m').
+
+    Returns:
+        tuple[bool, float]: Whether the tokens were granted, and otherwise the seconds until they would be.
+    """
+    now = int(time.time() * 1_000_000)
+    buckets = [_bucket(name, rate) for name, rate in buckets]
+    wait = _retry_after(buckets, now)
+    if wait > 0:
+        return False, wait
+
+    charged = []
+    for key, interval, tolerance in buckets:
+        wait = _charge(key, interval, tolerance, now)
+        if wait:
+            # A concurrent request emptied this bucket after the check; refund the others
+            for charged_key, charged_interval in charged:
+                try:
+                    cache.decr(charged_key, charged_interval)
+                except ValueError:
+                    pass
+            return False, wait
+        charged.append((key, interval))
+    return True, 0
+
+
+def _count(scope, outcome):
+    key = f'ratelimit:stats:{scope}:{outcome}:{random.randrange(COUNTER_SHARDS)}'
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def rate_limit_counters():
+    """
+    Returns the admitted and rejected request counts for every rate-limited scope.
+
+    Returns:
+        dict: e.g. {'reserve': {'admitted': 120, 'rejected': 3}}
+    """
+    keys = {
+        (scope, outcome): [f'ratelimit:stats:{scope}:{outcome}:{shard}' for shard in range(COUNTER_SHARDS)]
+        for scope in _scopes for outcome in ('admitted', 'rejected')
+    }
+    values = cache.get_many([key for shard_keys in keys.values() for key in shard_keys])
+    counters = {scope: {} for scope in _scopes}
+    for (scope, outcome), shard_keys in keys.items():
+        counters[scope][outcome] = sum(values.get(key, 0) for key in shard_keys)
+    return counters
+
+
+def _reject(scope, retry_after):
+    _count(scope, 'rejected')
+    response = JsonResponse({'message': 'Too many requests. Please try again later.'}, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def rate_limit(scope, methods=('POST',)):
+    """
+    Decorator that applies the per-user and per-IP buckets configured in
+    `settings.RATE_LIMITS[scope]` (e.g. {'user': '10/m', 'ip': '30/m'}) to a view.
+
+    Only requests using one of `methods` are limited. For class-based views, apply it to
+    `dispatch` with `method_decorator` so it runs before any mixin touches the database.
+    """
+    _scopes.add(scope)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not settings.RATELIMIT_ENABLE or request.method not in methods:
+                return view(request, *args, **kwargs)
+
+            rates = settings.RATE_LIMITS.get(scope, {})
+            buckets = []
+            if 'ip' in rates:
+                buckets.append((f'{scope}:ip:{client_ip(request)}', rates['ip']))
+                # Turn away a flood from one address before the session is loaded from the database
+                wait = _retry_after([_bucket(*buckets[0])], int(time.time() * 1_000_000))
+                if wait > 0:
+                    return _reject(scope, wait)
+            user_id = session_user_id(request) if 'user' in rates else None
+            if user_id:
+                buckets.append((f'{scope}:user:{user_id}', rates['user']))
+
+            allowed, wait = take_tokens(buckets)
+            if not allowed:
+                return _reject(scope, wait)
+
+            _count(scope, 'admitted')
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,120 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ('default'). Reads go to the 'replica' alias only inside views
+marked with `ReplicaReadMixin` or `@read_from_replica`, and only if a replica is configured.
+
+After a client performs a write or logs in, `ReplicaStickinessMiddleware` sets a short-lived
+cookie; while it is present that client's reads stay on the primary, so users always see their
+own reservations, registrations and new events even if the replica is lagging. Sessions, users
+and content types are always read from the primary, since a lagging replica would log users out
+right after they log in.
+"""
+import contextvars
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+PIN_COOKIE = 'primary_pin'
+PRIMARY_ONLY_APPS = {'auth', 'contenttypes', 'sessions'}
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_available():
+    return REPLICA in connections.databases
+
+
+def is_pinned_to_primary(request):
+    """
+    Returns True if the client wrote recently and must keep reading from the primary.
+    """
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_to_primary(request):
+    """
+    Marks the request so the response pins its client to the primary, e.g. after a login
+    performed in a GET request.
+    """
+    request.pin_to_primary = True
+
+
+def read_from_replica(view):
+    """
+    Decorator that sends the view's reads to the replica, unless the client is pinned to the primary.
+    Template responses are rendered inside the view so lazy querysets are evaluated on the replica too.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not replica_available() or is_pinned_to_primary(request):
+            return view(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            return response
+        finally:
+            _use_replica.reset(token)
+    return wrapped
+
+
+class ReplicaReadMixin:
+    """
+    Class-based view mixin equivalent of `read_from_replica`.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        return read_from_replica(super().dispatch)(request, *args, **kwargs)
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes reads to the replica when the current view opted in, and everything else to the primary.
+    """
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so objects read from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication, not migrations
+        return db != REPLICA
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins a client to the primary for `settings.REPLICA_STICKY_SECONDS` after any successful write
+    request, or any request marked with `pin_to_primary`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            replica_available()
+            and (request.method not in ('GET', 'HEAD', 'OPTIONS') or getattr(request, 'pin_to_primary', False))
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,243 @@
+from collections import Counter
+from datetime import datetime
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models import Count, Max
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .event_calendar import event_month, invalidate_month
+from .geo import event_index
+from .models import Event, EventDeletion, ReservationLog
+from .routers import pin_to_primary
+from .trending import record_logged_reservations, record_popularity
+from .utils import bump_events_cache_version
+
+
+@receiver(m2m_changed, sender=Event.reserved_by.through)
+def log_reservation_changes(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Appends a RESERVE or CANCEL row to the reservation log for every reservation added or
+    removed, in either direction of the relation, and adds or removes its trending weight.
+    A reservation counts from the time of its log row, and a cancellation removes the weight
+    of the matching RESERVE or PROMOTE row, so reserving and cancelling leaves no trace.
+
+    Connected before `promote_waitlist_on_release`, so a cancellation is logged ahead of the
+    promotion it triggers.
+    """
+    if action in ('pre_remove', 'pre_clear'):
+        # Only existing reservations are removed, and post_clear is not told which ones
+        lookup = {'profile_id': instance.pk} if reverse else {'event_id': instance.pk}
+        if action == 'pre_remove':
+            lookup['event_id__in' if reverse else 'profile_id__in'] = pk_set
+        instance._logged_removals = list(sender.objects.filter(**lookup).values_list('event_id', 'profile_id'))
+        instance._reserved_at = {
+            (event_id, profile_id): at
+            for event_id, profile_id, at in ReservationLog.objects.filter(
+                action__in=[ReservationLog.RESERVE, ReservationLog.PROMOTE], **lookup
+            ).order_by().values('event_id', 'profile_id').annotate(at=Max('created_at'))
+            .values_list('event_id', 'profile_id', 'at')
+        }
+        return
+    if action == 'post_add':
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in sorted(pk_set)]
+        log_action = ReservationLog.RESERVE
+    elif action in ('post_remove', 'post_clear'):
+        pairs = getattr(instance, '_logged_removals', [])
+        log_action = ReservationLog.CANCEL
+    else:
+        return
+    if not pairs:
+        return
+
+    occupancy = dict(
+        sender.objects.filter(event_id__in={event_id for event_id, _ in pairs})
+        .order_by().values('event_id').annotate(count=Count('pk')).values_list('event_id', 'count')
+    )
+    # Several rows for one event each record the occupancy right after their own change
+    changes = Counter(event_id for event_id, _ in pairs)
+    applied = Counter()
+    rows = []
+    for event_id, profile_id in pairs:
+        applied[event_id] += 1
+        pending = changes[event_id] - applied[event_id]
+        after = occupancy.get(event_id, 0) + (-pending if log_action == ReservationLog.RESERVE else pending)
+        rows.append(ReservationLog(event_id=event_id, profile_id=profile_id, action=log_action, occupancy=after))
+    ReservationLog.objects.bulk_create(rows)
+
+    if log_action == ReservationLog.RESERVE:
+        record_logged_reservations(rows)
+    else:
+        # Reservations made before the log existed have no time; count them as made now
+        reserved_at = getattr(instance, '_reserved_at', {})
+        for pair in pairs:
+            record_popularity(pair[0], weight=-1, at=reserved_at.get(pair))
+
+
+@receiver(m2m_changed, sender=Event.reserved_by.through)
+def promote_waitlist_on_release(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Promotes waitlisted profiles whenever reservations are removed from an event.
+
+    Handles both directions of the relation: `event.reserved_by.remove(profile)` and
+    `profile.reserved_events.remove(event)`.
+    """
+    if reverse and action == 'pre_clear':
+        # The cleared event ids are not passed to post_clear, so remember them here
+        instance._released_event_ids = list(instance.reserved_events.values_list('pk', flat=True))
+        return
+    if action not in ('post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.promote_waitlist()
+        return
+
+    event_ids = pk_set if action == 'post_remove' else getattr(instance, '_released_event_ids', [])
+    for event in Event.objects.filter(pk__in=event_ids):
+        event.promote_waitlist()
+
+
+@receiver(post_save, sender=Event)
+def promote_waitlist_on_update(sender, instance, created, **kwargs):
+    """
+    Promotes waitlisted profiles when an existing event is saved, e.g. after its
+    reservation limit has been raised.
+    """
+    if not created:
+        instance.promote_waitlist()
+
+
+@receiver(post_save, sender=Event)
+def update_coordinate_index(sender, instance, **kwargs):
+    """
+    Keeps the in-memory coordinate index in step with saved events.
+    """
+    event_index.update(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_from_coordinate_index(sender, instance, **kwargs):
+    """
+    Drops deleted events from the in-memory coordinate index.
+    """
+    event_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_caches(sender, **kwargs):
+    """
+    Invalidates cached event listings, facet counts and pages whenever an event changes.
+    """
+    bump_events_cache_version()
+
+
+@receiver(m2m_changed, sender=Event.reserved_by.through)
+def invalidate_event_caches_on_reservation(sender, action, **kwargs):
+    """
+    Invalidates cached pages when reservations change, since event pages show reservation counts.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_events_cache_version()
+
+
+def stored_calendar_month(pk, using):
+    """
+    Returns the calendar month of an event's date as stored in the database, or None.
+    """
+    date = Event.objects.using(using).filter(pk=pk).values_list('date', flat=True).first()
+    return event_month(date) if date else None
+
+
+@receiver(pre_save, sender=Event)
+def remember_calendar_month(sender, instance, using, **kwargs):
+    """
+    Records the month an existing event is currently stored in, so a date change can invalidate
+    the old month too.
+    """
+    instance._calendar_month = stored_calendar_month(instance.pk, using) if instance.pk else None
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_calendar_month(sender, instance, using, **kwargs):
+    """
+    Drops the cached calendar of the event's month, and of its previous month if the date moved.
+    """
+    months = set()
+    old_month = getattr(instance, '_calendar_month', None)
+    if old_month:
+        months.add(old_month)
+    date = instance.__dict__.get('date')  # Never trigger a query for a deferred date
+    if isinstance(date, datetime) and timezone.is_aware(date):
+        months.add(event_month(date))
+    elif kwargs.get('signal') is post_save:
+        # A naive or string date was assigned; use the value the database stored
+        new_month = stored_calendar_month(instance.pk, using)
+        if new_month:
+            months.add(new_month)
+    instance._calendar_month = None
+    for year, month in months:
+        invalidate_month(year, month)
+
+
+@receiver(m2m_changed, sender=Event.reserved_by.through)
+def invalidate_calendar_month_on_reservation(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drops the cached calendar of every month whose events gained or lost reservations.
+    """
+    if reverse and action == 'pre_clear':
+        instance._calendar_cleared_months = {
+            event_month(date) for date in instance.reserved_events.values_list('date', flat=True)
+        }
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        months = {event_month(instance.date)}
+    elif action == 'post_clear':
+        months = getattr(instance, '_calendar_cleared_months', set())
+    else:
+        months = {event_month(date) for date in Event.objects.filter(pk__in=pk_set).values_list('date', flat=True)}
+    for year, month in months:
+        invalidate_month(year, month)
+
+
+@receiver(post_delete, sender=Event)
+def record_event_deletion(sender, instance, **kwargs):
+    """
+    Leaves a tombstone so delta-sync clients learn that the event is gone.
+    """
+    EventDeletion.objects.create(event_id=instance.pk)
+
+
+@receiver(m2m_changed, sender=Event.reserved_by.through)
+def touch_events_on_reservation(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bumps `updated_at` of events whose reservations changed, since synced events carry reservation counts.
+    """
+    if reverse and action == 'pre_clear':
+        instance._touched_event_ids = list(instance.reserved_events.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == 'post_clear':
+        event_ids = getattr(instance, '_touched_event_ids', [])
+    else:
+        event_ids = pk_set
+    Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(user_logged_in)
+def pin_to_primary_on_login(sender, request, user, **kwargs):
+    """
+    Keeps a user who just logged in reading from the primary, even when the login happened in
+    a GET request such as the Auth0 callback.
+    """
+    if request is not None:
+        pin_to_primary(request)
@@ -0,0 +1,90 @@
+"""
+Content-addressed media storage.
+
+Uploads are stored once per unique content under '<upload_to>/<hh>/<sha256><ext>', where hh is
+the first two hex digits of the hash. Re-uploading a flyer or profile photo that already exists
+just returns the existing name, so identical images share one file on disk. Because names
+depend only on content, a stored file never changes, and several rows may reference it:
+orphans are removed by `gc_media`, which checks every reference before deleting anything.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+
+
+def is_content_addressed(name):
+    """
+    Returns True if the name already has the '<hh>/<sha256><ext>' form.
+    """
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def content_addressed_name(name, digest):
+    """
+    Builds the storage name for content with the given hex digest, keeping the directory and
+    (lower-cased) extension of the original name.
+    """
+    directory, filename = posixpath.split(name.replace('\\', '/'))
+    ext = os.path.splitext(filename)[1].lower()
+    return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+
+def hash_file(path, chunk_size=64 * 1024):
+    """
+    Returns the sha256 hex digest of a file on disk, read in chunks.
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files after the sha256 of their content.
+    """
+    def _save(self, name, content):
+        """
+        Streams the upload into a temporary file next to MEDIA_ROOT while hashing it, then
+        moves it into place under its content-addressed name, or discards it if that content
+        is already stored.
+        """
+        os.makedirs(self.location, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=self.location)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    tmp.write(chunk)
+            final_name = content_addressed_name(name, sha.hexdigest())
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                # Refresh the mtime so gc_media's --min-age keeps it until the new row is committed
+                os.utime(final_path)
+                return final_name
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if self.directory_permissions_mode is not None:
+                os.chmod(os.path.dirname(final_path), self.directory_permissions_mode)
+            # A concurrent upload of the same content writes identical bytes, so either rename may win
+            os.replace(tmp_path, final_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(final_path, self.file_permissions_mode)
+            return final_name
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_available_name(self, name, max_length=None):
+        """
+        The final name is only known once the content is hashed, and an existing file with
+        that name holds the same bytes, so no suffix is ever needed.
+        """
+        return name
@@ -0,0 +1,943 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .event_calendar import month_cache_key, month_summary
+from .geo import event_index
+from .geocoding import geocode
+from .middleware import AnonymousPageCacheMiddleware
+from .models import Event, GeocodeCache, Notification, Profile, ReservationLog, ReservationReminder
+from .ratelimit import rate_limit
+from .routers import PIN_COOKIE, ReplicaStickinessMiddleware, read_from_replica
+from .storage import ContentAddressedStorage, hash_file, is_content_addressed
+from .trending import trending_events
+
+
+def make_profile(username):
+    user = User.objects.create_user(username, f'{username}@bu.edu', 'password')
+    return Profile.objects.create(user=user, buid='U12345678')
+
+
+def make_event(owner, **kwargs):
+    kwargs.setdefault('name', 'Pizza Night')
+    kwargs.setdefault('date', timezone.now() + timedelta(days=1))
+    kwargs.setdefault('img', 'event_images/pizza.png')
+    return Event.objects.create(created_by=owner, **kwargs)
+
+
+def cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+def temp_media_root(test):
+    """
+    Points MEDIA_ROOT at a temporary directory for the duration of the test and returns its path.
+    """
+    media_root = tempfile.TemporaryDirectory()
+    test.addCleanup(media_root.cleanup)
+    settings_override = override_settings(MEDIA_ROOT=media_root.name)
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    return media_root.name
+
+
+def write_media(media_root, name, content, age=0):
+    """
+    Writes a file under the media root, backdating its mtime by `age` seconds.
+    """
+    path = os.path.join(media_root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if age:
+        mtime = os.path.getmtime(path) - age
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def media_files(media_root):
+    """
+    Returns the sorted names of every file under the media root.
+    """
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), media_root).replace(os.sep, '/')
+        for directory, _, names in os.walk(media_root) for name in names
+    )
+
+
+# Templates render without a collectstatic manifest
+PLAIN_STATIC = override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+
+
+@PLAIN_STATIC
+class APIValidationTests(TestCase):
+    """
+    Malformed query parameters are rejected with a 400 rather than raising.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('host')
+        make_event(cls.profile)
+
+    def assertBadRequest(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_event_cursor_not_a_pair(self):
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': cursor('5')})
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': cursor([1, 2, 3])})
+
+    def test_event_cursor_bad_date(self):
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': cursor(['garbage', 1])})
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': cursor(['2024-13-45T00:00:00', 1])})
+
+    def test_event_cursor_bad_id(self):
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': cursor([timezone.now().isoformat(), 'x'])})
+
+    def test_cursor_not_base64_json(self):
+        self.assertBadRequest(reverse('api_event_list'), {'cursor': '!!!'})
+        self.assertBadRequest(reverse('api_profile_list'), {'cursor': '!!!'})
+
+    def test_profile_cursor_not_an_id(self):
+        self.assertBadRequest(reverse('api_profile_list'), {'cursor': cursor([1, 2])})
+        self.assertBadRequest(reverse('api_profile_list'), {'cursor': cursor('abc')})
+
+    def test_bad_date_filter(self):
+        self.assertBadRequest(reverse('api_event_list'), {'date': 'notadate'})
+        self.assertBadRequest(reverse('api_event_list'), {'date': '2024-02-30'})
+
+    def test_valid_cursor_pages(self):
+        make_event(self.profile, name='Second')
+        response = self.client.get(reverse('api_event_list'), {'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        next_page = self.client.get(response.json()['next'])
+        self.assertEqual(next_page.status_code, 200)
+        self.assertEqual(len(next_page.json()['results']), 1)
+
+    def test_bad_date_ignored_by_event_list_page(self):
+        self.client.force_login(self.profile.user)
+        response = self.client.get(reverse('all_events'), {'date': 'notadate'})
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_malformed_sync_tokens(self):
+        url = reverse('api_event_sync')
+        now = timezone.now().isoformat()
+        for token in [
+            '!!!', cursor('5'), cursor([now]), cursor([now, 0, 0, False, 1]),
+            cursor(['2026-10-19T00:00:00', 0, None, False]),  # Naive datetime
+            cursor(['garbage', 0, 0, False]), cursor([5, 0, 0, False]),
+            cursor([now, 'abc', 0, False]), cursor([now, [1], 0, False]), cursor([now, True, 0, False]),
+            cursor([now, 0, 'x', False]), cursor([now, 0, None, False]), cursor([now, 0, 0, 'yes']),
+        ]:
+            with self.subTest(token=token):
+                response = self.client.get(url, {'token': token})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid token'})
+
+
+@override_settings(EVENT_SYNC_SAFETY_LAG=0)
+class EventSyncTests(TestCase):
+    """
+    Delta sync: a paged initial sync, then only changes and deletions since the token.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_profile('host')
+        cls.events = [make_event(cls.host, name=f'Event {i}') for i in range(3)]
+        make_event(cls.host, name='Past', date=timezone.now() - timedelta(days=2))
+
+    def sync(self, **params):
+        response = self.client.get(reverse('api_event_sync'), {'fields': 'id,name', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def initial_sync(self):
+        token, ids = None, []
+        while True:
+            page = self.sync(limit=2, **({'token': token} if token else {}))
+            ids += [event['id'] for event in page['changed']]
+            token = page['token']
+            if not page['has_more']:
+                return ids, token
+
+    def test_initial_sync_pages_upcoming_events(self):
+        first = self.sync(limit=2)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changed']), 2)
+        second = self.sync(limit=2, token=first['token'])
+        self.assertFalse(second['has_more'])
+        ids = [event['id'] for event in first['changed'] + second['changed']]
+        self.assertEqual(sorted(ids), [event.pk for event in self.events])
+
+    def test_changes_and_deletions_after_token(self):
+        _, token = self.initial_sync()
+        self.assertEqual(self.sync(token=token)['changed'], [])
+
+        changed, deleted = self.events[0], self.events[1]
+        changed.name = 'Renamed'
+        changed.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        page = self.sync(token=token)
+        self.assertEqual(page['changed'], [{'id': changed.pk, 'name': 'Renamed'}])
+        self.assertEqual(page['deleted'], [deleted_id])
+        follow_up = self.sync(token=page['token'])
+        self.assertEqual((follow_up['changed'], follow_up['deleted']), ([], []))
+
+    def test_expired_token(self):
+        since = (timezone.now() - timedelta(days=8)).isoformat()
+        response = self.client.get(reverse('api_event_sync'), {'token': cursor([since, 0, 0, False])})
+        self.assertEqual(response.status_code, 410)
+
+class CalendarInvalidationTests(TestCase):
+    """
+    Saving or deleting an event drops the cached calendar of the months it was and is in.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile('host')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_moving_an_event_invalidates_both_months(self):
+        event = make_event(self.profile, date=timezone.make_aware(datetime(2030, 1, 15, 12)))
+        month_summary(2030, 1)
+        month_summary(2030, 2)
+        self.assertIsNotNone(cache.get(month_cache_key(2030, 1)))
+
+        event = Event.objects.get(pk=event.pk)
+        event.date = timezone.make_aware(datetime(2030, 2, 15, 12))
+        event.save()
+
+        self.assertIsNone(cache.get(month_cache_key(2030, 1)))
+        self.assertIsNone(cache.get(month_cache_key(2030, 2)))
+
+    def test_string_and_naive_dates(self):
+        event = make_event(self.profile, date='2030-03-15T12:00:00+00:00')
+        month_summary(2030, 3)
+        event.name = 'Renamed'
+        event.save()
+        self.assertIsNone(cache.get(month_cache_key(2030, 3)))
+
+        month_summary(2030, 3)
+        month_summary(2030, 4)
+        event.date = '2030-04-15T12:00:00+00:00'
+        event.save()
+        self.assertIsNone(cache.get(month_cache_key(2030, 3)))
+        self.assertIsNone(cache.get(month_cache_key(2030, 4)))
+
+    def test_deleting_an_event_invalidates_its_month(self):
+        event = make_event(self.profile, date=timezone.make_aware(datetime(2030, 5, 15, 12)))
+        month_summary(2030, 5)
+        Event.objects.get(pk=event.pk).delete()
+        self.assertIsNone(cache.get(month_cache_key(2030, 5)))
+
+
+@PLAIN_STATIC
+class EventCalendarViewTests(TestCase):
+    """
+    Month pages render for every supported year and 404 outside it.
+    """
+
+    def test_month_range(self):
+        for (year, month), status in [
+            ((2, 1), 200), ((2026, 10), 200), ((9998, 12), 200),
+            ((1, 1), 404), ((1, 12), 404), ((9999, 1), 404), ((2026, 13), 404), ((2026, 0), 404),
+        ]:
+            with self.subTest(year=year, month=month):
+                response = self.client.get(reverse('event_calendar_month', args=[year, month]))
+                self.assertEqual(response.status_code, status)
+
+    def test_month_json_edges(self):
+        for year, month in [(1, 1), (9998, 12)]:
+            with self.subTest(year=year, month=month):
+                self.assertEqual(self.client.get(reverse('event_calendar_json', args=[year, month])).status_code, 200)
+
+@PLAIN_STATIC
+class ReservationTests(TestCase):
+    """
+    Reserving and cancelling keep the reservation log and trending scores in step.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_profile('host')
+        cls.guest = make_profile('guest')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.guest.user)
+
+    def test_reserve_then_cancel_leaves_trending(self):
+        event = make_event(self.host)
+        other = make_event(self.host, name='Bagels')
+        other.reserved_by.add(self.host)
+
+        response = self.client.post(reverse('reserve_spot', args=[event.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(event, trending_events())
+
+        response = self.client.post(reverse('cancel_reservation', args=[event.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(event, trending_events())
+        self.assertIn(other, trending_events())
+        self.assertEqual(
+            list(event.reservation_log.values_list('action', flat=True).order_by('pk')),
+            [ReservationLog.RESERVE, ReservationLog.CANCEL],
+        )
+
+    def test_cancel_after_event_started(self):
+        event = make_event(self.host, date=timezone.now() - timedelta(hours=1))
+        event.reserved_by.add(self.guest)
+        response = self.client.post(reverse('cancel_reservation', args=[event.pk]))
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(event.reserved_by.filter(pk=self.guest.pk).exists())
+
+    def test_log_outlives_event(self):
+        event = make_event(self.host)
+        event.reserved_by.add(self.guest)
+        event.delete()
+        entry = ReservationLog.objects.get(profile=self.guest)
+        self.assertIsNone(entry.event)
+        self.assertIn('(deleted event)', str(entry))
+
+
+class WaitlistTests(TestCase):
+    """
+    Full events queue profiles on a waitlist that is promoted in order as spots open up.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_profile('host')
+        cls.event = make_event(cls.host, reservation_limit=1)
+        cls.event.reserved_by.add(cls.host)
+        cls.guests = [make_profile(f'guest{i}') for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+
+    def reserve(self, profile):
+        self.client.force_login(profile.user)
+        return self.client.post(reverse('reserve_spot', args=[self.event.pk]))
+
+    def join(self):
+        for place, guest in enumerate(self.guests, 1):
+            response = self.reserve(guest)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json()['waitlist_position'], place)
+
+    def assertReserved(self, *profiles):
+        self.assertQuerySetEqual(self.event.reserved_by.order_by('pk'), sorted(profiles, key=lambda p: p.pk))
+
+    def assertNotified(self, *profiles):
+        notified = Notification.objects.filter(event=self.event).values_list('profile', flat=True)
+        self.assertEqual(sorted(notified), sorted(profile.pk for profile in profiles))
+
+    def test_promotion_on_event_side_remove(self):
+        self.join()
+        self.event.reserved_by.remove(self.host)
+        self.assertReserved(self.guests[0])
+        self.assertNotified(self.guests[0])
+        self.assertEqual(self.reserve(self.guests[2]).status_code, 400)  # Still waitlisted
+
+    def test_promotion_in_join_order_on_profile_side_remove(self):
+        self.join()
+        self.host.reserved_events.remove(self.event)
+        self.assertReserved(self.guests[0])
+        self.guests[0].reserved_events.remove(self.event)
+        self.assertReserved(self.guests[1])
+        self.assertNotified(self.guests[0], self.guests[1])
+        self.assertQuerySetEqual(self.event.waitlist_entries.values_list('profile', flat=True), [self.guests[2].pk])
+
+    def test_promotion_on_raised_limit(self):
+        self.join()
+        self.event.reservation_limit = 3
+        self.event.save()
+        self.assertReserved(self.host, self.guests[0], self.guests[1])
+        self.assertNotified(self.guests[0], self.guests[1])
+        self.assertEqual(ReservationLog.objects.filter(action=ReservationLog.PROMOTE).count(), 2)
+
+    def test_notifications_sent_once_on_commit(self):
+        self.join()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.reserved_by.remove(self.host)
+        self.assertEqual([message.to for message in mail.outbox], [[self.guests[0].user.email]])
+
+    def test_duplicate_join(self):
+        self.assertEqual(self.reserve(self.guests[0]).status_code, 202)
+        response = self.reserve(self.guests[0])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.event.waitlist_entries.count(), 1)
+
+    def test_direct_reservation_leaves_waitlist(self):
+        self.join()
+        Event.objects.filter(pk=self.event.pk).update(reservation_limit=2)  # Raised without the save signal
+        self.assertEqual(self.reserve(self.guests[1]).status_code, 200)
+        self.assertFalse(self.event.waitlist_entries.filter(profile=self.guests[1]).exists())
+        self.assertEqual(self.event.waitlist_entries.count(), 2)
+
+class ExportAttendeesTests(TestCase):
+    """
+    The attendee CSV lists reservations then the waitlist, and only the creator and staff may download it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_profile('host')
+        cls.event = make_event(cls.host, reservation_limit=2)
+        cls.guests = [make_profile(f'guest{i}') for i in range(3)]
+        for guest in cls.guests[:2]:
+            cls.event.reserved_by.add(guest)
+        cls.event.join_waitlist(cls.guests[2])
+        cls.url = reverse('export_attendees', args=[cls.event.pk])
+
+    def test_creator_gets_csv(self):
+        self.client.force_login(self.host.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="event-{self.event.pk}-attendees.csv"')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'username,email,buid,status',
+            'guest0,guest0@bu.edu,U12345678,reserved',
+            'guest1,guest1@bu.edu,U12345678,reserved',
+            'guest2,guest2@bu.edu,U12345678,waitlisted',
+        ])
+
+    def test_staff_allowed(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_other_user_forbidden(self):
+        self.client.force_login(self.guests[0].user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_anonymous_redirected_to_login(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f'{settings.LOGIN_URL}?next={self.url}', fetch_redirect_response=False)
+
+class MediaFileMiddlewareTests(TestCase):
+    """
+    Media requests are answered by `MediaFileMiddleware` with validators and byte ranges.
+    """
+
+    def setUp(self):
+        write_media(temp_media_root(self), 'a.txt', b'0123456789')
+
+    def test_whole_file(self):
+        response = self.client.get('/media/a.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertIn('ETag', response)
+
+    def test_null_byte_in_name(self):
+        self.assertEqual(self.client.get('/media/a%00.txt').status_code, 404)
+
+    def test_byte_range(self):
+        response = self.client.get('/media/a.txt', HTTP_RANGE='bytes=2-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'234')
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+
+    def test_invalid_range_is_ignored(self):
+        response = self.client.get('/media/a.txt', HTTP_RANGE='bytes=5-2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get('/media/a.txt', HTTP_RANGE='bytes=20-30')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+        self.assertIn('ETag', response)
+        self.assertIn('Cache-Control', response)
+
+
+class ContentAddressedStorageTests(TestCase):
+    """
+    Uploads are named after their sha256, stored once, and existing media can be migrated with `dedupe_media`.
+    """
+
+    def setUp(self):
+        self.media_root = temp_media_root(self)
+        self.storage = ContentAddressedStorage()
+        self.digest = hashlib.sha256(b'flyer').hexdigest()
+
+    def test_name_is_content_hash(self):
+        name = self.storage.save('event_images/Flyer.PNG', ContentFile(b'flyer'))
+        self.assertEqual(name, f'event_images/{self.digest[:2]}/{self.digest}.png')
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'flyer')
+        self.assertEqual(hash_file(self.storage.path(name)), self.digest)
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.storage.save('event_images/a.png', ContentFile(b'flyer'))
+        second = self.storage.save('event_images/b.png', ContentFile(b'flyer'))
+        other = self.storage.save('event_images/c.png', ContentFile(b'poster'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(media_files(self.media_root), sorted([first, other]))
+
+    def test_reuse_refreshes_mtime(self):
+        name = self.storage.save('event_images/a.png', ContentFile(b'flyer'))
+        path = self.storage.path(name)
+        os.utime(path, (0, 0))
+        self.storage.save('event_images/b.png', ContentFile(b'flyer'))
+        self.assertGreater(os.path.getmtime(path), time.time() - 60)
+
+    def test_dedupe_media(self):
+        host = make_profile('host')
+        for name in ('a.png', 'b.png'):
+            write_media(self.media_root, f'event_images/{name}', b'flyer')
+        write_media(self.media_root, 'event_images/c.png', b'poster')
+        flyers = [make_event(host, img='event_images/a.png'), make_event(host, img='event_images/b.png')]
+        poster = make_event(host, img='event_images/c.png')
+
+        call_command('dedupe_media', '--dry-run', stdout=StringIO())
+        self.assertEqual(Event.objects.get(pk=poster.pk).img.name, 'event_images/c.png')
+        self.assertEqual(media_files(self.media_root), ['event_images/a.png', 'event_images/b.png', 'event_images/c.png'])
+
+        out = StringIO()
+        call_command('dedupe_media', stdout=out)
+        self.assertIn('Saved 5 bytes', out.getvalue())
+        flyer_name = f'event_images/{self.digest[:2]}/{self.digest}.png'
+        for event in flyers:
+            event.refresh_from_db()
+            self.assertEqual(event.img.name, flyer_name)
+        poster.refresh_from_db()
+        self.assertTrue(is_content_addressed(poster.img.name))
+        self.assertEqual(media_files(self.media_root), sorted([flyer_name, poster.img.name]))
+        self.assertEqual(Profile.objects.get(pk=host.pk).img.name, 'default.jpg')
+
+@PLAIN_STATIC
+class AnonymousPageCacheTests(TestCase):
+    """
+    Anonymous visitors get cached public pages, keyed on the path and the event filters.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = make_event(make_profile('host'))
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('event_detail', args=[self.event.pk])
+
+    def get(self, url, params=None, **extra):
+        response = self.client.get(url, params, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_hit_skips_sessions_and_database(self):
+        self.assertEqual(self.get(self.url)['X-Page-Cache'], 'miss')
+        with mock.patch.object(SessionMiddleware, 'process_request', side_effect=AssertionError), self.assertNumQueries(0):
+            response = self.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Pizza Night')
+
+    def test_session_cookie_bypasses_cache(self):
+        self.get(self.url)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'abc'
+        self.assertNotIn('X-Page-Cache', self.get(self.url))
+
+    def test_responses_setting_cookies_are_not_cached(self):
+        def set_cookie(request):
+            response = HttpResponse()
+            response.set_cookie('csrftoken', 'abc')
+            return response
+
+        middleware = AnonymousPageCacheMiddleware(set_cookie)
+        for _ in range(2):
+            self.assertNotIn('X-Page-Cache', middleware(RequestFactory().get(self.url)))
+
+    def test_key_ignores_unknown_params_and_order(self):
+        url = reverse('all_events')
+        self.get(url, {'name': 'pizza', 'location': 'GSU'})
+        self.assertEqual(self.get(f'{url}?location=GSU&name=pizza&utm_source=mail')['X-Page-Cache'], 'hit')
+        self.assertEqual(self.get(url, {'name': 'bagels'})['X-Page-Cache'], 'miss')
+
+    def test_event_change_invalidates(self):
+        self.get(self.url)
+        self.event.name = 'Bagel Brunch'
+        self.event.save()
+        response = self.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Bagel Brunch')
+
+class GcMediaTests(TestCase):
+    """
+    `gc_media` removes old unreferenced files only, and a limited run resumes where it stopped.
+    """
+
+    def setUp(self):
+        self.media_root = temp_media_root(self)
+        make_event(make_profile('host'), img='event_images/kept.png')
+        write_media(self.media_root, 'default.jpg', b'avatar', age=7200)
+        write_media(self.media_root, 'event_images/kept.png', b'flyer', age=7200)
+        for name in ('a.png', 'b.png', 'c.png'):
+            write_media(self.media_root, f'event_images/orphan-{name}', b'old', age=7200)
+        write_media(self.media_root, 'event_images/new.png', b'upload')
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_old_orphans_only(self):
+        self.assertIn('Deleted 3 orphaned file(s), reclaiming 9 bytes', self.gc())
+        self.assertEqual(media_files(self.media_root), ['default.jpg', 'event_images/kept.png', 'event_images/new.png'])
+
+    def test_min_age(self):
+        self.gc('--min-age', '0')
+        self.assertEqual(media_files(self.media_root), ['default.jpg', 'event_images/kept.png'])
+
+    def test_dry_run(self):
+        before = media_files(self.media_root)
+        self.assertIn('Would remove 3 orphaned file(s)', self.gc('--dry-run'))
+        self.assertEqual(media_files(self.media_root), before)
+
+    def test_quarantine(self):
+        with tempfile.TemporaryDirectory() as quarantine:
+            self.gc('--quarantine', quarantine)
+            self.assertEqual(media_files(quarantine), [f'event_images/orphan-{name}' for name in ('a.png', 'b.png', 'c.png')])
+        self.assertEqual(media_files(self.media_root), ['default.jpg', 'event_images/kept.png', 'event_images/new.png'])
+
+    def test_resumes_after_max_files(self):
+        out = self.gc('--max-files', '4', '--chunk-size', '1')
+        self.assertIn('Scan incomplete', out)
+        self.assertEqual(media_files(self.media_root), [
+            '.gc_media_state.json', 'default.jpg', 'event_images/kept.png', 'event_images/new.png',
+            'event_images/orphan-b.png', 'event_images/orphan-c.png',
+        ])
+        out = self.gc()
+        self.assertIn('Resuming after event_images/orphan-a.png', out)
+        self.assertIn('Deleted 3 orphaned file(s), reclaiming 9 bytes (0.00 MB) across 6 scanned file(s)', out)
+        self.assertEqual(media_files(self.media_root), ['default.jpg', 'event_images/kept.png', 'event_images/new.png'])
+
+class NearbyEventsTests(TestCase):
+    """
+    The nearby endpoint returns the k nearest upcoming events within the radius, and follows event edits.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        host = make_profile('host')
+        cls.gsu = make_event(host, name='GSU', latitude=42.3510, longitude=-71.1088)
+        cls.kenmore = make_event(host, name='Kenmore', latitude=42.3489, longitude=-71.0952)  # About 1.1 km east
+        cls.cambridge = make_event(host, name='Cambridge', latitude=42.3736, longitude=-71.1097)  # About 2.5 km north
+        make_event(host, name='Unlocated')
+
+    def setUp(self):
+        event_index.rebuild()  # Drop rows left behind by other tests' rolled-back events
+
+    def nearby(self, **params):
+        response = self.client.get(reverse('events_nearby'), {'lat': 42.3505, 'lng': -71.1054, **params})
+        self.assertEqual(response.status_code, 200)
+        return [event['name'] for event in response.json()['events']]
+
+    def test_nearest_first(self):
+        self.assertEqual(self.nearby(), ['GSU', 'Kenmore', 'Cambridge'])
+
+    def test_radius_and_k(self):
+        self.assertEqual(self.nearby(radius=2), ['GSU', 'Kenmore'])
+        self.assertEqual(self.nearby(k=1), ['GSU'])
+
+    def test_moved_and_archived_events(self):
+        self.cambridge.latitude, self.cambridge.longitude = 42.3504, -71.1055
+        self.cambridge.save()
+        self.gsu.archived = True
+        self.gsu.save()
+        self.assertEqual(self.nearby(), ['Cambridge', 'Kenmore'])
+
+    def test_invalid_params(self):
+        for params in ({'lat': 'abc'}, {'lat': 91}, {'radius': 0}, {'k': -1}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('events_nearby'), {'lat': 42.35, 'lng': -71.1, **params})
+                self.assertEqual(response.status_code, 400)
+
+class GeocodeCacheTests(TestCase):
+    """
+    Cached misses are reused only while fresh and produced by the configured provider.
+    """
+
+    def cache_miss(self, provider, age_days=0):
+        GeocodeCache.objects.create(query='gsu', provider=provider)
+        GeocodeCache.objects.filter(query='gsu').update(created_at=timezone.now() - timedelta(days=age_days))
+
+    def test_fresh_miss_is_reused(self):
+        self.cache_miss('gazetteer')
+        self.assertIsNone(geocode('GSU'))
+
+    def test_miss_from_another_provider_is_resolved_again(self):
+        self.cache_miss('google')
+        self.assertIsNotNone(geocode('GSU'))
+        entry = GeocodeCache.objects.get(query='gsu')
+        self.assertEqual(entry.provider, 'gazetteer')
+        self.assertIsNotNone(entry.coordinates)
+
+    def test_expired_miss_is_resolved_again(self):
+        self.cache_miss('gazetteer', age_days=31)
+        self.assertIsNotNone(geocode('GSU'))
+        self.assertIsNotNone(GeocodeCache.objects.get(query='gsu').coordinates)
+
+
+class BrokenEmailBackend(EmailBackend):
+    """
+    Mail backend whose first send fails and which cannot reconnect afterwards.
+    """
+    opened = 0
+
+    def open(self):
+        BrokenEmailBackend.opened += 1
+        if BrokenEmailBackend.opened > 1:
+            raise OSError('Connection refused')
+        return super().open()
+
+    def send_messages(self, messages):
+        raise OSError('Connection reset')
+
+
+@PLAIN_STATIC
+class SendRemindersTests(TestCase):
+    """
+    Reminder records are only kept for messages handed to the mail server.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        host = make_profile('host')
+        event = make_event(host, date=timezone.now() + timedelta(hours=2))
+        cls.guests = [make_profile('guest1'), make_profile('guest2')]
+        event.reserved_by.add(*cls.guests)
+
+    def send_reminders(self):
+        out = StringIO()
+        call_command('send_reminders', stdout=out)
+        return out.getvalue()
+
+    def test_sends_once(self):
+        self.send_reminders()
+        self.assertEqual(ReservationReminder.objects.count(), 2)
+        self.assertIn('Sent 0', self.send_reminders())
+
+    @override_settings(EMAIL_BACKEND='spark_bytes_app.tests.BrokenEmailBackend')
+    def test_failed_reconnect_releases_claims(self):
+        BrokenEmailBackend.opened = 0
+        with self.assertLogs('spark_bytes_app.management.commands.send_reminders', 'ERROR'):
+            output = self.send_reminders()
+        self.assertIn('1 failed, 1 not attempted', output)
+        self.assertFalse(ReservationReminder.objects.exists())
+
+
+class ExplodingSession(dict):
+    def get(self, key, default=None):
+        raise AssertionError('The session was loaded')
+
+
+@override_settings(RATELIMIT_ENABLE=True, RATE_LIMITS={'test': {'ip': '4/m', 'user': '2/m'}})
+class RateLimitTests(SimpleTestCase):
+    """
+    Buckets allow a burst of `limit` requests and then one request every `period / limit`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.view = rate_limit('test')(lambda request: HttpResponse('ok'))
+        self.now = 1_000_000.0
+        clock = mock.patch('spark_bytes_app.ratelimit.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def post(self, user_id=None, session=None):
+        request = RequestFactory().post('/')
+        request.session = session if session is not None else {SESSION_KEY: user_id} if user_id else {}
+        return self.view(request)
+
+    def test_burst_then_steady_rate(self):
+        self.assertEqual([self.post().status_code for _ in range(5)], [200, 200, 200, 200, 429])
+        self.now += 15  # One token every 60 / 4 seconds
+        self.assertEqual(self.post().status_code, 200)
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '15')
+
+    def test_no_burst_across_window_boundary(self):
+        self.now = 1_000_059.0  # Just before a minute boundary
+        for _ in range(4):
+            self.assertEqual(self.post().status_code, 200)
+        self.now += 2
+        self.assertEqual(self.post().status_code, 429)
+
+    def test_rejected_request_does_not_charge_other_bucket(self):
+        self.assertEqual(self.post(user_id=1).status_code, 200)
+        self.assertEqual(self.post(user_id=1).status_code, 200)
+        for _ in range(5):
+            self.assertEqual(self.post(user_id=1).status_code, 429)
+        # The user bucket rejected those, so the IP bucket still has tokens for another user
+        self.assertEqual(self.post(user_id=2).status_code, 200)
+        self.assertEqual(self.post(user_id=2).status_code, 200)
+
+    def test_ip_rejection_skips_session(self):
+        for _ in range(4):
+            self.post()
+        self.assertEqual(self.post(session=ExplodingSession()).status_code, 429)
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Reads in replica views go to the replica unless the client wrote recently; writes never do.
+    """
+
+    def setUp(self):
+        available = mock.patch('spark_bytes_app.routers.replica_available', return_value=True)
+        available.start()
+        self.addCleanup(available.stop)
+        self.view = read_from_replica(lambda request: HttpResponse(router.db_for_read(Event)))
+
+    def test_reads_in_replica_views(self):
+        self.assertEqual(self.view(RequestFactory().get('/')).content, b'replica')
+        self.assertEqual(router.db_for_read(Event), 'default')
+        self.assertEqual(router.db_for_write(Event), 'default')
+
+    def test_writes_pin_client_to_primary(self):
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse())
+        response = middleware(RequestFactory().post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertNotIn(PIN_COOKIE, middleware(RequestFactory().get('/')).cookies)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self.assertEqual(self.view(request).content, b'default')
+
+    def test_auth_tables_read_from_primary(self):
+        view = read_from_replica(lambda request: HttpResponse(
+            ' '.join(router.db_for_read(model) for model in (User, Session, ContentType, Event))
+        ))
+        self.assertEqual(view(RequestFactory().get('/')).content, b'default default default replica')
+
+    def test_login_in_get_request_pins_client(self):
+        def log_in(request):
+            user_logged_in.send(sender=User, request=request, user=mock.Mock())
+            return HttpResponse()
+
+        self.assertIn(PIN_COOKIE, ReplicaStickinessMiddleware(log_in)(RequestFactory().get('/')).cookies)
+
+    def test_failed_writes_do_not_pin(self):
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=400))
+        self.assertNotIn(PIN_COOKIE, middleware(RequestFactory().post('/')).cookies)
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'spark_bytes_app'))
+        self.assertTrue(router.allow_migrate('default', 'spark_bytes_app'))
+
+
+class EventQuerySetTests(TestCase):
+    """
+    `upcoming()` keeps events that are probably still going on, and `past()` is its complement.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        host = make_profile('host')
+        now = timezone.now()
+        gsu = {'latitude': 42.3510, 'longitude': -71.1088}
+        cls.future = make_event(host, date=now + timedelta(hours=1), **gsu)
+        cls.ongoing = make_event(host, date=now - timedelta(hours=1), **gsu)
+        cls.over = make_event(host, date=now - timedelta(hours=7), **gsu)
+        cls.archived = make_event(host, date=now + timedelta(hours=1), archived=True, **gsu)
+        for event in (cls.future, cls.ongoing, cls.over, cls.archived):
+            event.reserved_by.add(host)
+
+    def test_upcoming_includes_started_events_within_grace(self):
+        self.assertQuerySetEqual(Event.objects.upcoming().order_by('date'), [self.ongoing, self.future])
+
+    def test_past_is_complement_of_upcoming(self):
+        self.assertQuerySetEqual(Event.objects.past().order_by('date'), [self.over, self.archived])
+
+    def test_archive_events_uses_same_grace(self):
+        call_command('archive_events', stdout=StringIO())
+        self.assertQuerySetEqual(Event.objects.filter(archived=True).order_by('date'), [self.over, self.archived])
+
+    def test_trending_uses_same_grace(self):
+        self.assertEqual({event.pk for event in trending_events()}, {self.future.pk, self.ongoing.pk})
+
+    def test_nearby_uses_same_grace(self):
+        event_index.rebuild()
+        nearest = event_index.nearest(42.3510, -71.1088, radius_km=1, k=10)
+        self.assertEqual({event_id for event_id, _ in nearest}, {self.future.pk, self.ongoing.pk})
+
+
+@PLAIN_STATIC
+class AdminSearchTests(TestCase):
+    """
+    Admin searches match name/location prefixes, BUIDs, usernames and emails.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_profile('host')
+        cls.pizza = make_event(cls.host, name='Pizza Night', location='GSU')
+        cls.bagels = make_event(make_profile('baker'), name='Bagels', location='Photonics Center')
+        cls.admin = User.objects.create_superuser('admin', 'admin@bu.edu', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def search(self, url_name, term):
+        response = self.client.get(reverse(url_name), {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['cl'].result_list)
+
+    def test_event_search(self):
+        self.assertEqual(self.search('admin:spark_bytes_app_event_changelist', 'pizza'), [self.pizza])
+        self.assertEqual(self.search('admin:spark_bytes_app_event_changelist', 'photon'), [self.bagels])
+        self.assertEqual(self.search('admin:spark_bytes_app_event_changelist', 'host'), [self.pizza])
+        self.assertEqual(self.search('admin:spark_bytes_app_event_changelist', 'night'), [])
+
+    def test_profile_search(self):
+        self.assertEqual(self.search('admin:spark_bytes_app_profile_changelist', 'host'), [self.host])
+        self.assertEqual(self.search('admin:spark_bytes_app_profile_changelist', 'HOST@bu.edu'), [self.host])
+        self.assertEqual(len(self.search('admin:spark_bytes_app_profile_changelist', 'u12345678')), 2)
+
+    def test_reservation_log_changelist_queries(self):
+        url = reverse('admin:spark_bytes_app_reservationlog_changelist')
+        self.pizza.reserved_by.add(self.host)
+        with CaptureQueriesContext(connection) as one_row:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        for username in ('guest1', 'guest2', 'guest3'):
+            self.bagels.reserved_by.add(make_profile(username))
+        with CaptureQueriesContext(connection) as four_rows:
+            self.assertContains(self.client.get(url), 'guest3')
+        self.assertEqual(len(four_rows), len(one_row))
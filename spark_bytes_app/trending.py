@@ -0,0 +1,109 @@
+"""
+Time-decayed event popularity ("trending now").
+
+Scores live in `EventPopularity` in log space (see its docstring). A reservation at time t adds
+e^(t / tau) to the decayed sum, so in log space the update is a log-sum-exp:
+
+    score' = max(score, x) + ln(1 + e^-|score - x|)     where x = t / tau + ln(weight)
+
+and removing a reservation made at time t is score' = score + ln(1 - e^(x - score)). Both are
+computed by the database in a single UPDATE, so concurrent reservations never lose an update,
+and neither ever exponentiates a large number.
+"""
+import math
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Least, Ln
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import EventPopularity, grace_cutoff
+
+# A removal leaving less than this fraction of the weight resets the score to 0 (no weight)
+MIN_REMAINING = 1e-9
+
+
+def decay_tau():
+    """
+    Returns the decay time constant in seconds for the configured half-life.
+    """
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def log_weight(at, weight=1):
+    """
+    Returns ln(weight * e^(t / tau)) for a reservation made at `at`.
+    """
+    return at.timestamp() / decay_tau() + math.log(weight)
+
+
+def current_popularity(score, now=None):
+    """
+    Converts a stored score into the decayed number of reservations as of now.
+    """
+    if not score:
+        return 0.0
+    return math.exp(score - log_weight(now or timezone.now()))
+
+
+def record_popularity(event_id, weight=1, at=None):
+    """
+    Adds (or, with a negative weight, removes) reservations made at `at` to an event's score.
+
+    Args:
+        event_id (int): The event whose popularity changed.
+        weight (int): Number of reservations added (positive) or cancelled (negative).
+        at (datetime): When the reservations were made; defaults to now. Pass the original
+            reservation time when cancelling so exactly its contribution is removed.
+    """
+    if not weight:
+        return
+    x = Value(log_weight(at or timezone.now(), abs(weight)))
+    score = F('score')
+    one, zero = Value(1.0), Value(0.0)
+    if weight > 0:
+        expression = Greatest(score, x) + Ln(one + Exp(-Abs(score - x)))
+    else:
+        remaining = one - Exp(Least(x - score, zero))
+        expression = Case(
+            When(GreaterThan(remaining, MIN_REMAINING), then=Greatest(score + Ln(remaining), zero)),
+            default=zero,
+        )
+
+    rows = EventPopularity.objects.filter(event_id=event_id)
+    if not rows.update(score=expression):
+        EventPopularity.objects.bulk_create([EventPopularity(event_id=event_id)], ignore_conflicts=True)
+        rows.update(score=expression)
+
+
+def record_logged_reservations(log_rows):
+    """
+    Adds the reservations in newly written RESERVE or PROMOTE log rows to their events' scores,
+    each counted from its row's `created_at`, so cancelling it later removes exactly its weight.
+    """
+    weights = Counter((row.event_id, row.created_at) for row in log_rows)
+    for (event_id, at), weight in weights.items():
+        record_popularity(event_id, weight, at=at)
+
+
+def trending_events(limit=None):
+    """
+    Returns the most popular upcoming events (including ones still within their grace period), most
+    popular first, in one query over the score index.
+
+    Returns:
+        list[Event]: Events annotated with `recent_reservations`, the decayed reservation count as of now.
+    """
+    rows = (
+        EventPopularity.objects.filter(score__gt=0, event__archived=False, event__date__gte=grace_cutoff())
+        .select_related('event', 'event__created_by__user')
+        .order_by('-score')[:limit or settings.TRENDING_SIZE]
+    )
+    now = timezone.now()
+    events = []
+    for row in rows:
+        row.event.recent_reservations = current_popularity(row.score, now)
+        events.append(row.event)
+    return events
@@ -1,6 +1,15 @@
-import qrcode
 from io import BytesIO
 import base64
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CACHE_VERSION_KEY = 'events:version'
 
 def generate_qr_code(data):
     """
@@ -23,6 +32,9 @@ def generate_qr_code(data):
         qr_code = generate_qr_code("https://Spark-Bytes.com/event")
         # `qr_code` contains a base64-encoded PNG image of the QR code.
     """
+    # qrcode pulls in PIL, so it is imported on first use rather than at worker startup
+    import qrcode
+
     # Create a QRCode object with specified parameters
     qr = qrcode.QRCode(
         version=1,  # Controls the size of the QR code (1 is the smallest).
@@ -39,4 +51,68 @@ def generate_qr_code(data):
     img.save(buffered, format="PNG")  # Save the image in PNG format to the buffer
 
     # Convert the image data to a base64-encoded string
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
\ No newline at end of file
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+def send_notifications(notification_ids):
+    """
+    Delivers queued notifications by email over a single SMTP connection.
+
+    Args:
+        notification_ids (list[int]): Primary keys of the notifications to deliver.
+
+    Returns:
+        int: The number of notifications that were delivered.
+
+    Notifications that were already delivered are skipped, so calling this twice with the
+    same ids never sends a message twice. Failed deliveries are logged and left pending.
+    """
+    from .models import Notification  # Imported here to avoid a circular import
+
+    pending = list(
+        Notification.objects.filter(pk__in=notification_ids, sent_at__isnull=True)
+        .select_related('profile__user')
+    )
+    if not pending:
+        return 0
+
+    messages = [
+        EmailMessage(
+            notification.subject,
+            notification.message,
+            settings.DEFAULT_FROM_EMAIL,
+            [notification.profile.user.email],
+        )
+        for notification in pending
+        if notification.profile.user.email
+    ]
+    try:
+        get_connection().send_messages(messages)
+    except Exception as e:
+        logger.error(f"Failed to send notifications: {str(e)}")
+        return 0
+
+    Notification.objects.filter(pk__in=[notification.pk for notification in pending]).update(
+        sent_at=timezone.now()
+    )
+    return len(pending)
+
+
+def events_cache_version():
+    """
+    Returns the current version number of cached event data.
+
+    Cache keys for anything derived from the event table include this number, so bumping it
+    invalidates all of them at once without having to know which keys exist.
+    """
+    return cache.get_or_set(EVENTS_CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def bump_events_cache_version():
+    """
+    Invalidates all cached event data by moving to a new version number.
+    """
+    try:
+        cache.incr(EVENTS_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(EVENTS_CACHE_VERSION_KEY, 2, timeout=None)
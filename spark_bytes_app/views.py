@@ -4,76 +4,111 @@ from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
-from django.views.generic import ListView, DetailView, FormView, CreateView
-from django.http import JsonResponse
+from django.views.generic import ListView, DetailView, FormView, CreateView, TemplateView
+from django.utils import timezone
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.decorators import method_decorator
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
-from email.mime.image import MIMEImage
+from django.db import transaction
+from django.core.cache import cache
+import calendar
+import csv
 import json
 import base64
 
 from .forms import CustomUserCreationForm, CustomAuthenticationForm, EventForm
 from .models import Profile, Event
-from .utils import generate_qr_code
+from .utils import generate_qr_code, events_cache_version
+from .event_calendar import adjacent_months, month_summary
+from .filters import filter_events, facet_counts, filter_cache_key
+from .geo import event_index
+from .profiling import capture_path, list_captures
+from .ratelimit import rate_limit, rate_limit_counters
+from .routers import ReplicaReadMixin, read_from_replica
+from .trending import trending_events
 
 
-class EventListView(ListView):
+class EventListView(ReplicaReadMixin, ListView):
     """
-    Displays a list of all events. Supports filtering by name, location, date, food types, and allergies.
+    Displays a list of upcoming events. Supports filtering by name, location, date, food types, and allergies.
     """
     model = Event
     template_name = 'spark_bytes/all_events.html'
     context_object_name = 'events'
+    archived = False
+
+    def get_base_queryset(self):
+        """
+        Returns the events to filter: upcoming events, soonest first.
+        """
+        return Event.objects.upcoming().order_by('date')
 
     def get_queryset(self):
         """
         Filters the events based on search parameters provided in the GET request.
         """
-        queryset = super().get_queryset()
-        name = self.request.GET.get('name', '')
-        location = self.request.GET.get('location', '')
-        date = self.request.GET.get('date', '')
-        food_types = self.request.GET.getlist('food_types')
-        allergies = self.request.GET.getlist('allergies')
-
-        if name:
-            queryset = queryset.filter(name__icontains=name)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        if date:
-            queryset = queryset.filter(date__date=date)
-        if food_types:
-            queryset = queryset.filter(food_types__in=food_types)
-        if allergies:
-            for allergy in allergies:
-                queryset = queryset.filter(allergies__icontains=allergy)
-
-        return queryset
+        return filter_events(self.get_base_queryset(), self.request.GET)
+
+    def get_facets(self):
+        """
+        Returns the food type and allergen facet counts for the current filters.
+        Counts are cached per filter state until an event changes or the cache timeout expires.
+        """
+        scope = 'archived' if self.archived else 'upcoming'
+        key = filter_cache_key(f'event_facets:{scope}:v{events_cache_version()}', self.request.GET)
+        facets = cache.get(key)
+        if facets is None:
+            facets = facet_counts(self.get_base_queryset(), self.request.GET)
+            cache.set(key, facets, settings.EVENT_LIST_CACHE_TIMEOUT)
+        return facets
 
     def get_context_data(self, **kwargs):
         """
-        Adds food types, allergies, and selected filters to the context.
+        Adds food type and allergy facets with match counts, and the selected filters, to the context.
         """
         context = super().get_context_data(**kwargs)
-        context['food_types'] = [
-            "Italian", "Mediterranean", "Salad", "American", "BBQ", 
-            "Chinese", "Korean", "Japanese", "Mexican", "Spanish", 
-            "Indian", "Thai", "Vietnamese", "Sushi", "Breakfast", 
-            "Lunch", "Vegan", "Vegetarian"
-        ]
-        context['allergies'] = [
-            "Dairy", "Soy", "Nuts", "Fish", "Shellfish", "Eggs", 
-            "Wheat", "Sesame"
-        ]
+        facets = self.get_facets()
+        context['food_types'] = facets['food_types']
+        context['allergies'] = facets['allergies']
         context['selected_food_types'] = self.request.GET.getlist('food_types')
         context['selected_allergies'] = self.request.GET.getlist('allergies')
+        context['archived'] = self.archived
         return context
 
 
-class ProfileListView(ListView):
+class ArchivedEventListView(EventListView):
+    """
+    Displays past and archived events, most recent first, with the same filters as the upcoming list.
+    """
+    archived = True
+
+    def get_base_queryset(self):
+        """
+        Returns past events, most recent first.
+        """
+        return Event.objects.past().order_by('-date')
+
+
+class TrendingEventsView(ReplicaReadMixin, ListView):
+    """
+    Displays the upcoming events with the most recent reservations, most popular first.
+    """
+    template_name = 'spark_bytes/trending_events.html'
+    context_object_name = 'events'
+
+    def get_queryset(self):
+        """
+        Returns the top events from the materialized popularity ranking.
+        """
+        return trending_events()
+
+
+class ProfileListView(ReplicaReadMixin, ListView):
     """
     Displays a list of all user profiles.
     """
@@ -82,7 +117,7 @@ class ProfileListView(ListView):
     context_object_name = 'profiles'
 
 
-class ProfileDetailView(DetailView):
+class ProfileDetailView(ReplicaReadMixin, DetailView):
     """
     Displays details of a specific user profile, including the events created by the user.
     """
@@ -92,14 +127,16 @@ class ProfileDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         """
-        Adds the list of events created by the profile to the context.
+        Adds the upcoming and past events created by the profile to the context.
         """
         context = super().get_context_data(**kwargs)
-        context['events'] = Event.objects.filter(created_by=self.object)
+        events = Event.objects.filter(created_by=self.object)
+        context['events'] = events.upcoming().order_by('date')
+        context['past_events'] = events.past().order_by('-date')
         return context
 
 
-class EventDetailView(DetailView):
+class EventDetailView(ReplicaReadMixin, DetailView):
     """
     Displays details of a specific event.
     """
@@ -109,10 +146,14 @@ class EventDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         """
-        Adds the creator's profile to the context.
+        Adds the creator's profile and the current user's waitlist entry, if any, to the context.
         """
         context = super().get_context_data(**kwargs)
         context['profile'] = self.object.created_by
+        if self.request.user.is_authenticated:
+            context['waitlist_entry'] = self.object.waitlist_entries.filter(
+                profile__user=self.request.user
+            ).first()
         return context
 
 
@@ -155,9 +196,11 @@ class CreateEventView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+@method_decorator(rate_limit('reserve'), name='dispatch')
 class ReserveSpotView(LoginRequiredMixin, DetailView):
     """
     Allows a user to reserve a spot for an event and generates a QR code for confirmation.
+    If the event is full, the user is placed on the event's waitlist instead.
     """
     model = Event
     template_name = 'spark_bytes/event_detail.html'
@@ -167,20 +210,30 @@ class ReserveSpotView(LoginRequiredMixin, DetailView):
         """
         Handles the reservation process, including checking for available spots,
         adding the user to the reservation list, generating a QR code, and sending confirmation email.
+        When no spots are left, the user joins the waitlist and is promoted automatically once a spot opens.
         """
         event = self.get_object()
         profile = Profile.objects.get(user=request.user)
 
-        if event.is_full():
-            return JsonResponse({'message': 'This event is full. No more spots are available.'}, status=400)
-
         if event.reserved_by.filter(id=profile.id).exists():
             return JsonResponse({'message': 'You have already reserved a spot for this event.'}, status=400)
 
-        event.reserved_by.add(profile)
+        if event.is_full():
+            if event.waitlist_entries.filter(profile=profile).exists():
+                return JsonResponse({'message': 'You are already on the waitlist for this event.'}, status=400)
+
+            place = event.join_waitlist(profile).get_place()
+            return JsonResponse({
+                'message': f'This event is full. You have been added to the waitlist at position {place}.',
+                'waitlist_position': place,
+            }, status=202)
+
+        with transaction.atomic():
+            event.reserved_by.add(profile)
+            # A waitlisted user who reserves a freed spot directly no longer waits for one
+            event.waitlist_entries.filter(profile=profile).delete()
         unique_data = f"{profile.user.email}_{event.id}"
         qr_code_data = generate_qr_code(unique_data)
-        event.save()
 
         # Send confirmation email with QR code
         try:
@@ -216,6 +269,8 @@ class ReserveSpotView(LoginRequiredMixin, DetailView):
         email.attach_alternative(html_content, "text/html")
 
         # Attach QR code as inline image
+        from email.mime.image import MIMEImage  # Imported on first use to keep worker startup light
+
         qr_image_data = base64.b64decode(qr_code_data)
         qr_image = MIMEImage(qr_image_data)
         qr_image.add_header('Content-ID', '<qr_code>')
@@ -226,6 +281,38 @@ class ReserveSpotView(LoginRequiredMixin, DetailView):
         email.send()
 
 
+@method_decorator(rate_limit('reserve'), name='dispatch')
+class CancelReservationView(LoginRequiredMixin, DetailView):
+    """
+    Allows a user to cancel their reservation (or leave the waitlist) for an event.
+    The freed spot goes to the first waitlisted profile, if any.
+    """
+    model = Event
+
+    def post(self, request, *args, **kwargs):
+        """
+        Removes the reservation and releases its spot in one transaction, with a bounded number of queries:
+        the reservation, waitlist promotion and trending score are handled by the reserved_by signals, which
+        also write the reservation log. Events that have already started cannot be cancelled.
+        """
+        event = self.get_object()
+        profile = Profile.objects.get(user=request.user)
+
+        # Not `upcoming()`, which keeps events listed for a grace period after they start
+        if event.date <= timezone.now():
+            return JsonResponse({'message': 'This event has already started.'}, status=400)
+
+        with transaction.atomic():
+            if not event.reserved_by.filter(pk=profile.pk).exists():
+                if event.waitlist_entries.filter(profile=profile).delete()[0]:
+                    return JsonResponse({'message': 'You have left the waitlist.'}, status=200)
+                return JsonResponse({'message': 'You do not have a reservation for this event.'}, status=400)
+
+            event.reserved_by.remove(profile)
+
+        return JsonResponse({'message': 'Your reservation has been cancelled.'}, status=200)
+
+
 class CustomLoginView(LoginView):
     """
     Handles user login using a custom authentication form.
@@ -269,6 +356,62 @@ class DeleteEventView(UserPassesTestMixin, DetailView):
         return JsonResponse({'message': 'Event deleted successfully!'}, status=200)
 
 
+class Echo:
+    """
+    Pseudo-buffer for csv.writer: returns each written row instead of storing it.
+    """
+    def write(self, value):
+        return value
+
+
+class ExportAttendeesView(UserPassesTestMixin, DetailView):
+    """
+    Streams an event's attendee list as CSV to its creator or staff.
+    """
+    model = Event
+
+    def test_func(self):
+        """
+        Restricts access to the event creator and staff.
+        """
+        user = self.request.user
+        if not user.is_authenticated:
+            return False
+        return user.is_staff or Event.objects.filter(
+            pk=self.kwargs['pk'], created_by__user=user
+        ).exists()
+
+    def rows(self, event_id):
+        """
+        Yields header, reserved attendees, then waitlisted ones, without loading them all into memory.
+        """
+        yield ['username', 'email', 'buid', 'status']
+        reservations = Event.reserved_by.through.objects.filter(event_id=event_id).order_by('id')
+        for username, email, buid in reservations.values_list(
+            'profile__user__username', 'profile__user__email', 'profile__buid'
+        ).iterator(chunk_size=500):
+            yield [username, email, buid, 'reserved']
+        waitlist = self.object.waitlist_entries.order_by('position')
+        for username, email, buid in waitlist.values_list(
+            'profile__user__username', 'profile__user__email', 'profile__buid'
+        ).iterator(chunk_size=500):
+            yield [username, email, buid, 'waitlisted']
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a streaming CSV response named after the event.
+        """
+        self.object = self.get_object()
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in self.rows(self.object.pk)),
+            content_type='text/csv',
+        )
+        response['Content-Disposition'] = f'attachment; filename="event-{self.object.pk}-attendees.csv"'
+        return response
+
+
+@rate_limit('login')
 def auth0_callback(request):
     """
     Handles Auth0 OAuth callback.
@@ -331,6 +474,77 @@ def auth0_callback(request):
     return redirect('all_events')
 
 
+@read_from_replica
+def events_nearby(request):
+    """
+    Returns the k nearest upcoming events to a point as JSON.
+
+    Query parameters:
+        lat, lng: Coordinates of the origin, in degrees (required).
+        radius: Search radius in kilometres (default 5, at most 50).
+        k: Maximum number of events to return (default 10, at most 100).
+    """
+    try:
+        latitude = float(request.GET['lat'])
+        longitude = float(request.GET['lng'])
+        radius = float(request.GET.get('radius', 5))
+        k = int(request.GET.get('k', 10))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'lat and lng are required and must be numbers'}, status=400)
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({'error': 'lat/lng out of range'}, status=400)
+    if radius <= 0 or k <= 0:
+        return JsonResponse({'error': 'radius and k must be positive'}, status=400)
+
+    nearest = event_index.nearest(latitude, longitude, min(radius, 50), min(k, 100))
+    events = Event.objects.in_bulk([event_id for event_id, _ in nearest])
+
+    results = []
+    for event_id, distance in nearest:
+        event = events.get(event_id)
+        if event is None:  # Deleted by another worker since the index was built
+            continue
+        results.append({
+            'id': event.id,
+            'name': event.name,
+            'location': event.location,
+            'date': event.date.isoformat(),
+            'latitude': event.latitude,
+            'longitude': event.longitude,
+            'image_url': event.img.url if event.img else '',
+            'distance_km': round(distance, 3),
+        })
+    return JsonResponse({'events': results})
+
+
+@staff_member_required
+def rate_limit_stats(request):
+    """
+    Returns the admitted and rejected request counters of every rate-limited endpoint as JSON (staff only).
+    """
+    return JsonResponse({'rate_limits': rate_limit_counters()})
+
+
+@staff_member_required
+def profile_captures(request):
+    """
+    Lists the most recent request profiles captured by RequestProfilerMiddleware (staff only).
+    """
+    return render(request, 'spark_bytes/profile_captures.html', {'captures': list_captures()})
+
+
+@staff_member_required
+def profile_capture_download(request, capture_id, ext):
+    """
+    Downloads the pstats ('prof') or collapsed-stack ('collapsed') file of a capture (staff only).
+    """
+    path = capture_path(capture_id, f'.{ext}')
+    if path is None:
+        raise Http404('Profile capture not found.')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{capture_id}.{ext}')
+
+
 def registration_success(request):
     """
     Displays the registration success page.
@@ -338,7 +552,7 @@ def registration_success(request):
     return render(request, 'spark_bytes/registration_success.html')
 
 
-class EventMapView(ListView):
+class EventMapView(ReplicaReadMixin, ListView):
     """
     Displays events on a map. Provides events as JSON for map rendering.
     """
@@ -348,9 +562,9 @@ class EventMapView(ListView):
 
     def get_queryset(self):
         """
-        Returns events that have latitude and longitude coordinates.
+        Returns upcoming events that have latitude and longitude coordinates.
         """
-        return Event.objects.filter(
+        return Event.objects.upcoming().filter(
             latitude__isnull=False,
             longitude__isnull=False
         ).exclude(latitude=0, longitude=0)
@@ -376,4 +590,49 @@ class EventMapView(ListView):
             })
         
         context['events_json'] = json.dumps(events_data)
-        return context
\ No newline at end of file
+        return context
+
+class EventCalendarView(ReplicaReadMixin, TemplateView):
+    """
+    Displays a month calendar with the number of events and the most reserved events on each day.
+    Defaults to the current month.
+    """
+    template_name = 'spark_bytes/event_calendar.html'
+
+    def get(self, request, *args, **kwargs):
+        # The grid and the previous/next links reach into the adjacent years, which must be valid dates too
+        if 'month' in kwargs and not (1 <= kwargs['month'] <= 12 and 2 <= kwargs['year'] <= 9998):
+            raise Http404('Invalid month.')
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the month summary, the month's weeks as rows of days, and the adjacent months to the context.
+        """
+        context = super().get_context_data(**kwargs)
+        today = timezone.localdate()
+        year = kwargs.get('year', today.year)
+        month = kwargs.get('month', today.month)
+        days = month_summary(year, month)['days']
+
+        weeks = []
+        for week in calendar.Calendar(firstweekday=6).monthdatescalendar(year, month):
+            weeks.append([
+                {'date': day, 'in_month': day.month == month, **days.get(day.isoformat(), {'count': 0, 'top_events': []})}
+                for day in week
+            ])
+        (context['previous_year'], context['previous_month']), (context['next_year'], context['next_month']) = (
+            adjacent_months(year, month)
+        )
+        context.update({'year': year, 'month': month, 'month_name': calendar.month_name[month], 'weeks': weeks, 'today': today})
+        return context
+
+
+@read_from_replica
+def event_calendar_json(request, year, month):
+    """
+    Returns per-day event counts and the most reserved events of a month as JSON.
+    """
+    if not (1 <= month <= 12 and 1 <= year < 9999):
+        return JsonResponse({'error': 'month must be between 1 and 12 and year between 1 and 9998'}, status=400)
+    return JsonResponse(month_summary(year, month))